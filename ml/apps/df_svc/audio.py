@@ -4,10 +4,11 @@ import os
 import math
 import logging
 import threading
-from typing import Tuple, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, Dict, Any, List
 from dataclasses import dataclass
 from enum import Enum
-from contextlib import contextmanager
+from contextlib import nullcontext
 
 import numpy as np
 
@@ -15,6 +16,13 @@ import numpy as np
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# AASIST sees one canonical input length so compiled kernels are never re-specialized
+AASIST_TARGET_SAMPLES = int(os.getenv("AASIST_TARGET_SAMPLES", "64000"))  # 4 s at 16 kHz
+# Clips per batched AASIST forward; a fixed batch shape means one extra compile at most
+AASIST_BATCH_SIZE = int(os.getenv("AASIST_BATCH_SIZE", "8"))
+# reduce-overhead (CUDA graphs) suits single-clip inference; max-autotune trades startup for kernels
+AASIST_COMPILE_MODE = os.getenv("AASIST_COMPILE_MODE", "reduce-overhead")
+
 class DetectionMethod(Enum):
     AASIST_MODEL = "aasist_model"
     SPECTRAL_ANALYSIS = "spectral_analysis"
@@ -52,6 +60,8 @@ class AudioDeepfakeDetector:
         self.confidence_threshold = confidence_threshold
         self.device = self._pick_device()
         self.model = None
+        self.half_precision = False
+        self.half_dtype = None
         self.model_lock = threading.Lock()
         self._initialize_model()
         
@@ -79,17 +89,49 @@ class AudioDeepfakeDetector:
                 if self.model is not None:
                     return
                     
-                logger.info(f"Loading AASIST model from {self.model_path} on {self.device}")
+                logger.info("Loading AASIST model from %s on %s", self.model_path, self.device)
                 self.model = torch.jit.load(self.model_path, map_location=self.device)
                 self.model.eval()
                 
+                # 16-bit weights on CUDA: halves weight bandwidth and enables tensor cores
+                # (bfloat16 on Ampere+ for FP32-like range, else FP16)
+                if self.device == "cuda":
+                    # Input shape is fixed (AASIST_TARGET_SAMPLES), so autotuned conv algorithms are reused
+                    torch.backends.cudnn.benchmark = True
+                    # TF32 for any op that still runs in FP32
+                    torch.set_float32_matmul_precision("high")
+                    torch.backends.cuda.matmul.allow_tf32 = True
+                    torch.backends.cudnn.allow_tf32 = True
+                    try:
+                        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+                        self.model = self.model.to(dtype)
+                        self.half_dtype = dtype
+                        self.half_precision = True
+                    except Exception as e:
+                        logger.warning("16-bit conversion failed, keeping FP32: %s", e)
+                
                 # Compile for performance if available
+                eager_model = self.model
                 if hasattr(torch, "compile"):
                     try:
-                        self.model = torch.compile(self.model, mode="reduce-overhead")
-                        logger.info("Model compiled for optimized performance")
+                        self.model = torch.compile(
+                            self.model, mode=AASIST_COMPILE_MODE, dynamic=False, fullgraph=False
+                        )
+                        logger.info("Model compiled for optimized performance (mode=%s)", AASIST_COMPILE_MODE)
                     except Exception as e:
-                        logger.warning(f"Model compilation failed: {e}")
+                        logger.warning("Model compilation failed: %s", e)
+                
+                # Warm up on the canonical shape so compilation happens off the request path
+                try:
+                    dtype = self.half_dtype if self.half_precision else torch.float32
+                    dummy = torch.zeros(1, AASIST_TARGET_SAMPLES, device=self.device, dtype=dtype)
+                    with torch.inference_mode():
+                        self.model(dummy)
+                    logger.info("AASIST model warmed up")
+                except Exception as e:
+                    # A compile that fails on first call would fail every request; go eager
+                    logger.warning("Model warmup failed, using eager model: %s", e)
+                    self.model = eager_model
                         
                 logger.info("AASIST model loaded successfully")
                 
@@ -113,10 +155,15 @@ class AudioDeepfakeDetector:
         audio_data = None
         sample_rate = None
         
-        # Try torchaudio first (most reliable)
-        audio_data, sample_rate = self._load_with_torchaudio(audio_path, target_sr)
+        # Try torchaudio first (most reliable); it and soundfile decode only the
+        # centre max_duration window instead of the whole file
+        audio_data, sample_rate = self._load_with_torchaudio(audio_path, target_sr, max_duration)
         
-        # Fallback to librosa
+        # Fallback to soundfile decode + C resampler
+        if audio_data is None:
+            audio_data, sample_rate = self._load_with_soundfile(audio_path, target_sr, max_duration)
+        
+        # Last resort: librosa
         if audio_data is None:
             audio_data, sample_rate = self._load_with_librosa(audio_path, target_sr)
             
@@ -133,28 +180,46 @@ class AudioDeepfakeDetector:
             
         return audio_data.astype(np.float32), sample_rate
 
-    def _load_with_torchaudio(self, audio_path: str, target_sr: int) -> Tuple[Optional[np.ndarray], Optional[int]]:
+    def _center_window(self, total_frames: int, sr: int, max_duration: Optional[int]) -> Tuple[int, int]:
+        """(offset, frames) of the centre max_duration window, or (0, -1) for the whole file."""
+        if not max_duration or total_frames <= 0:
+            return 0, -1
+        window = int(sr * max_duration)
+        if total_frames <= window:
+            return 0, -1
+        return (total_frames - window) // 2, window
+
+    def _load_with_torchaudio(self, audio_path: str, target_sr: int,
+                              max_duration: Optional[int] = None) -> Tuple[Optional[np.ndarray], Optional[int]]:
         """Load audio using torchaudio with enhanced error handling."""
         try:
             import torch
             import torchaudio
             
-            waveform, original_sr = torchaudio.load(audio_path)
+            frame_offset, num_frames = 0, -1
+            if max_duration:
+                try:
+                    info = torchaudio.info(audio_path)
+                    frame_offset, num_frames = self._center_window(info.num_frames, info.sample_rate, max_duration)
+                except Exception:
+                    pass  # header unreadable up front: decode everything
+            waveform, original_sr = torchaudio.load(audio_path, frame_offset=frame_offset, num_frames=num_frames)
             
             # Convert to mono if multi-channel
             if waveform.dim() > 1 and waveform.size(0) > 1:
                 waveform = torch.mean(waveform, dim=0, keepdim=True)
             waveform = waveform.reshape(1, -1)
             
-            # Resample if necessary
+            # Resample if necessary (width-16 Hann window: ~4x fewer taps than
+            # Kaiser/64 with no audible difference for detection)
             if original_sr != target_sr:
                 waveform = torchaudio.functional.resample(
                     waveform, 
                     original_sr, 
                     target_sr,
-                    lowpass_filter_width=64,
-                    rolloff=0.9475937167399596,
-                    resampling_method="sinc_interp_kaiser"
+                    lowpass_filter_width=16,
+                    rolloff=0.99,
+                    resampling_method="sinc_interp_hann"
                 )
                 
             # Convert to numpy
@@ -165,6 +230,40 @@ class AudioDeepfakeDetector:
             logger.debug(f"TorchAudio loading failed: {e}")
             return None, None
 
+    def _load_with_soundfile(self, audio_path: str, target_sr: int,
+                             max_duration: Optional[int] = None) -> Tuple[Optional[np.ndarray], Optional[int]]:
+        """Load audio with soundfile and resample with soxr (or torchaudio) instead of librosa."""
+        try:
+            import soundfile as sf
+            
+            info = sf.info(audio_path)
+            start, frames = self._center_window(info.frames, info.samplerate, max_duration)
+            audio_data, sr = sf.read(audio_path, start=start, frames=frames, dtype="float32", always_2d=True)
+            if audio_data.shape[1] == 1:
+                audio_data = np.ascontiguousarray(audio_data[:, 0])  # mono: no mean() pass
+            else:
+                audio_data = audio_data.mean(axis=1)
+            
+            if sr != target_sr:
+                try:
+                    import soxr
+                    audio_data = soxr.resample(audio_data, sr, target_sr, quality="HQ")
+                except ImportError:
+                    import torch
+                    import torchaudio
+                    audio_data = torchaudio.functional.resample(
+                        torch.from_numpy(audio_data),
+                        sr,
+                        target_sr,
+                        lowpass_filter_width=16,
+                        rolloff=0.99,
+                        resampling_method="sinc_interp_hann"
+                    ).numpy()
+            return audio_data, target_sr
+        except Exception as e:
+            logger.debug("Soundfile loading failed: %s", e)
+            return None, None
+
     def _load_with_librosa(self, audio_path: str, target_sr: int) -> Tuple[Optional[np.ndarray], Optional[int]]:
         """Load audio using librosa fallback."""
         try:
@@ -181,18 +280,18 @@ class AudioDeepfakeDetector:
             return None, None
 
     def _sanitize_audio(self, audio_data: np.ndarray) -> np.ndarray:
-        """Clean and normalize audio data."""
+        """Clean and normalize audio data in place (the loaders hand us a fresh array)."""
         # Remove NaN and infinite values
-        audio_data = np.nan_to_num(audio_data, nan=0.0, posinf=0.0, neginf=0.0)
+        audio_data = np.nan_to_num(audio_data, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
         
         # Clip to prevent extreme values
-        audio_data = np.clip(audio_data, -1.0, 1.0)
+        np.clip(audio_data, -1.0, 1.0, out=audio_data)
         
-        # Normalize volume if too quiet
-        max_val = np.max(np.abs(audio_data))
+        # Normalize volume if too quiet (peak via min/max avoids an abs() temporary)
+        max_val = max(float(audio_data.max()), -float(audio_data.min()))
         if max_val < 0.1:  # Too quiet
-            audio_data = audio_data / (max_val + 1e-8)
-            audio_data = np.clip(audio_data, -1.0, 1.0)
+            # Scaling by 1/peak keeps samples within [-1, 1], so no second clip is needed
+            audio_data *= 1.0 / (max_val + 1e-8)
             
         return audio_data
 
@@ -215,38 +314,102 @@ class AudioDeepfakeDetector:
             return None
             
         try:
-            import torch
-            
-            # Load and preprocess audio
             audio_data, sr = self.load_audio(audio_path)
+        except Exception as e:
+            logger.error("Model inference failed: %s", e)
+            return None
+        return self._analyze_with_model_array(audio_data)
+
+    def _analyze_with_model_array(self, audio_data: np.ndarray) -> Optional[float]:
+        """Run AASIST model inference on an already loaded 16 kHz waveform."""
+        if self.model is None:
+            return None
             
-            # Convert to tensor
-            audio_tensor = torch.from_numpy(audio_data).unsqueeze(0)  # [1, T]
-            audio_tensor = audio_tensor.to(self.device)
-            
-            # Run inference with optimization
-            with torch.inference_mode():
-                # Use mixed precision if available
-                if self.device in ["cuda", "mps"]:
-                    with torch.amp.autocast(self.device):  # type: ignore
-                        logit = self.model(audio_tensor)
-                else:
-                    logit = self.model(audio_tensor)
-                
-                # Handle different output formats
-                if isinstance(logit, (tuple, list)):
-                    logit = logit[0]
-                    
-                # Convert to probability
-                probability = torch.sigmoid(logit.flatten()[0]).item()
+        try:
+            import torch
+            
+            # Pad/trim to the canonical length the model was compiled for
+            audio_tensor = torch.from_numpy(self._fit_length(audio_data)).unsqueeze(0)  # [1, T]
+            probability = float(self._run_model(audio_tensor)[0])
                 
-            logger.debug(f"Model inference result: {probability:.4f}")
-            return float(np.clip(probability, 0.0, 1.0))
+            logger.debug("Model inference result: %.4f", probability)
+            return probability
             
         except Exception as e:
-            logger.error(f"Model inference failed: {e}")
+            logger.error("Model inference failed: %s", e)
             return None
 
+    def analyze_with_model_batch(self, audio_paths: List[str]) -> List[Optional[float]]:
+        """
+        AASIST probabilities for many files with one forward pass per
+        AASIST_BATCH_SIZE clips instead of one per file.
+        
+        Returns:
+            One probability per path, None where the file could not be loaded
+            or the model is unavailable
+        """
+        results: List[Optional[float]] = [None] * len(audio_paths)
+        if self.model is None:
+            return results
+            
+        import torch
+        
+        clips, indices = [], []
+        for i, path in enumerate(audio_paths):
+            try:
+                clips.append(self._fit_length(self.load_audio(path)[0]))
+                indices.append(i)
+            except Exception as e:
+                logger.error("Model inference failed for %s: %s", path, e)
+                
+        for start in range(0, len(clips), AASIST_BATCH_SIZE):
+            chunk = clips[start:start + AASIST_BATCH_SIZE]
+            # Short last batch is zero-padded so the compiled model keeps one batch shape
+            batch = np.zeros((AASIST_BATCH_SIZE, AASIST_TARGET_SAMPLES), dtype=np.float32)
+            batch[:len(chunk)] = chunk
+            try:
+                probabilities = self._run_model(torch.from_numpy(batch))
+            except Exception as e:
+                logger.error("Batched model inference failed: %s", e)
+                continue
+            for j in range(len(chunk)):
+                results[indices[start + j]] = float(probabilities[j])
+                
+        return results
+
+    def _fit_length(self, audio_data: np.ndarray) -> np.ndarray:
+        """Centre-crop or zero-pad a waveform to AASIST_TARGET_SAMPLES as contiguous float32."""
+        if len(audio_data) > AASIST_TARGET_SAMPLES:
+            audio_data = self._extract_center_segment(audio_data, AASIST_TARGET_SAMPLES)
+        elif len(audio_data) < AASIST_TARGET_SAMPLES:
+            audio_data = np.pad(audio_data, (0, AASIST_TARGET_SAMPLES - len(audio_data)))
+        return np.ascontiguousarray(audio_data, dtype=np.float32)
+
+    def _run_model(self, audio_tensor) -> np.ndarray:
+        """Clipped sigmoid probabilities for a [B, T] float32 waveform batch."""
+        import torch
+        
+        audio_tensor = audio_tensor.to(self.device)
+        if self.half_precision:
+            audio_tensor = audio_tensor.to(self.half_dtype)
+        
+        # Run inference with optimization (serialized: detect() runs analyses concurrently)
+        with self.model_lock, torch.inference_mode():
+            # Use mixed precision on MPS (CUDA already runs native 16-bit weights)
+            amp_ctx = (torch.autocast(device_type="mps", dtype=torch.float16)
+                       if self.device == "mps" else nullcontext())
+            with amp_ctx:
+                logit = self.model(audio_tensor)
+            
+            # Handle different output formats
+            if isinstance(logit, (tuple, list)):
+                logit = logit[0]
+                
+            # Convert to probability (one logit per clip)
+            probabilities = torch.sigmoid(logit.reshape(len(audio_tensor), -1)[:, 0].float()).cpu().numpy()
+            
+        return np.clip(probabilities, 0.0, 1.0)
+
     def analyze_spectral_features(self, audio_path: str) -> float:
         """
         Enhanced spectral analysis for artifact detection.
@@ -255,10 +418,15 @@ class AudioDeepfakeDetector:
             Artifact score (0=clean, 1=likely synthetic)
         """
         try:
-            import librosa
-            
             audio_data, sr = self.load_audio(audio_path, max_duration=30)
-            
+        except Exception as e:
+            logger.error("Spectral analysis failed: %s", e)
+            return 0.5  # Neutral on error
+        return self._analyze_spectral_array(audio_data, sr)
+
+    def _analyze_spectral_array(self, audio_data: np.ndarray, sr: int) -> float:
+        """Spectral artifact score for an already loaded waveform (<= 30 s)."""
+        try:
             if len(audio_data) < sr:  # Very short audio
                 return 0.35
                 
@@ -269,7 +437,7 @@ class AudioDeepfakeDetector:
             return float(np.clip(score, 0.0, 1.0))
             
         except Exception as e:
-            logger.error(f"Spectral analysis failed: {e}")
+            logger.error("Spectral analysis failed: %s", e)
             return 0.5  # Neutral on error
 
     def _extract_spectral_features(self, audio_data: np.ndarray, sr: int) -> Dict[str, float]:
@@ -281,40 +449,38 @@ class AudioDeepfakeDetector:
         
         features = {}
         
-        # Time-domain features
-        features['rms'] = float(np.median(librosa.feature.rms(
-            y=audio_data, frame_length=frame_length, hop_length=hop_length
-        )))
-        features['zcr'] = float(np.median(librosa.feature.zero_crossing_rate(
-            y=audio_data, frame_length=frame_length, hop_length=hop_length
-        )))
-        
-        # Spectral features
-        spectral_centroid = librosa.feature.spectral_centroid(
-            y=audio_data, sr=sr, n_fft=frame_length, hop_length=hop_length
-        )
+        # One STFT shared by RMS and every spectral feature below
+        S = np.abs(librosa.stft(audio_data, n_fft=frame_length, hop_length=hop_length))
+        
+        # RMS from the magnitude spectrogram (Parseval) instead of re-framing the signal
+        features['rms'] = float(np.median(librosa.feature.rms(S=S, frame_length=frame_length)))
+        
+        # Framewise zero-crossing rate from one sign-change pass and a cumulative sum
+        crossings = np.abs(np.diff(np.signbit(audio_data).view(np.int8)))
+        starts = np.arange(0, len(crossings) - frame_length + 1, hop_length)
+        if len(starts):
+            cumulative = np.concatenate(([0], np.cumsum(crossings, dtype=np.int64)))
+            zcr = (cumulative[starts + frame_length] - cumulative[starts]) / frame_length
+            features['zcr'] = float(np.median(zcr))
+        else:
+            features['zcr'] = float(crossings.mean()) if len(crossings) else 0.0
+        
+        spectral_centroid = librosa.feature.spectral_centroid(S=S, sr=sr)
         features['spectral_centroid'] = float(np.median(spectral_centroid))
         
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(
-            y=audio_data, sr=sr, n_fft=frame_length, hop_length=hop_length
-        )
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)
         features['spectral_bandwidth'] = float(np.median(spectral_bandwidth))
         
-        spectral_rolloff = librosa.feature.spectral_rolloff(
-            y=audio_data, sr=sr, n_fft=frame_length, hop_length=hop_length
-        )
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)
         features['spectral_rolloff'] = float(np.median(spectral_rolloff))
         
         # Spectral contrast
-        spectral_contrast = librosa.feature.spectral_contrast(
-            y=audio_data, sr=sr, n_fft=frame_length, hop_length=hop_length
-        )
+        spectral_contrast = librosa.feature.spectral_contrast(S=S, sr=sr)
         features['spectral_contrast'] = float(np.median(spectral_contrast))
         
-        # MFCCs (first 5 coefficients)
-        mfccs = librosa.feature.mfcc(
-            y=audio_data, sr=sr, n_mfcc=13, n_fft=frame_length, hop_length=hop_length
-        )
+        # MFCCs (first 5 coefficients) from the log-power mel spectrogram of the same STFT
+        mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr)
+        mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=5)
         for i in range(5):
             features[f'mfcc_{i+1}'] = float(np.median(mfccs[i]))
             
@@ -363,9 +529,16 @@ class AudioDeepfakeDetector:
             Prosody abnormality score (0=normal, 1=abnormal)
         """
         try:
-            import librosa
-            
             audio_data, sr = self.load_audio(audio_path, max_duration=30)
+        except Exception as e:
+            logger.warning("Prosody analysis failed: %s", e)
+            return 0.3  # Conservative default
+        return self._analyze_prosody_array(audio_data, sr)
+
+    def _analyze_prosody_array(self, audio_data: np.ndarray, sr: int) -> float:
+        """Prosody abnormality score for an already loaded waveform (<= 30 s)."""
+        try:
+            import librosa
             
             # Extract prosodic features
             tempo, _ = librosa.beat.beat_track(y=audio_data, sr=sr)
@@ -395,7 +568,7 @@ class AudioDeepfakeDetector:
             return float(np.clip(score, 0.0, 1.0))
             
         except Exception as e:
-            logger.warning(f"Prosody analysis failed: {e}")
+            logger.warning("Prosody analysis failed: %s", e)
             return 0.3  # Conservative default
 
     def _extract_pitch(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
@@ -409,8 +582,9 @@ class AudioDeepfakeDetector:
                 f0, _ = pw.dio(audio_data.astype(np.float64), sr, frame_period=10)
                 return f0[f0 > 0]  # Remove unvoiced segments
             except ImportError:
-                # Fallback to librosa
-                f0, _, _ = librosa.pyin(
+                # Fallback to librosa YIN (no Viterbi decoding like pyin; only the
+                # spread of f0 matters for the monotonic-pitch heuristic)
+                f0 = librosa.yin(
                     audio_data, 
                     fmin=50, 
                     fmax=400, 
@@ -418,7 +592,7 @@ class AudioDeepfakeDetector:
                     frame_length=1024,
                     hop_length=256
                 )
-                return f0[~np.isnan(f0)]  # Remove NaN values
+                return f0[np.isfinite(f0)]  # Remove NaN/inf values
                 
         except Exception:
             return np.array([])
@@ -426,9 +600,15 @@ class AudioDeepfakeDetector:
     def get_audio_metadata(self, audio_path: str) -> Dict[str, Any]:
         """Extract audio file metadata."""
         try:
-            import librosa
-            
             audio_data, sr = self.load_audio(audio_path)
+        except Exception as e:
+            logger.warning("Could not extract audio metadata: %s", e)
+            return {}
+        return self._metadata_from_array(audio_data, sr)
+
+    def _metadata_from_array(self, audio_data: np.ndarray, sr: int) -> Dict[str, Any]:
+        """Derive audio metadata from an already loaded waveform."""
+        try:
             duration = len(audio_data) / sr
             
             return {
@@ -441,7 +621,7 @@ class AudioDeepfakeDetector:
                 "is_too_long": duration > 300.0
             }
         except Exception as e:
-            logger.warning(f"Could not extract audio metadata: {e}")
+            logger.warning("Could not extract audio metadata: %s", e)
             return {}
 
     def detect(self, audio_path: str) -> AudioDetectionResult:
@@ -457,17 +637,29 @@ class AudioDeepfakeDetector:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
             
-        logger.info(f"Starting audio deepfake analysis: {audio_path}")
+        logger.info("Starting audio deepfake analysis: %s", audio_path)
         
         try:
+            # Decode, resample and sanitize once; every analysis reuses the array
+            audio_data, sr = self.load_audio(audio_path)
+            # Spectral/prosody analyses look at the central 30 seconds only
+            analysis_audio = self._extract_center_segment(audio_data, sr * 30)
+            
             # Extract metadata first
-            audio_metadata = self.get_audio_metadata(audio_path)
+            audio_metadata = self._metadata_from_array(audio_data, sr)
             
-            # Run all available detection methods
+            # Run all available detection methods concurrently; librosa/torch
+            # release the GIL for most of their work
             method_scores = {}
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                model_future = executor.submit(self._analyze_with_model_array, audio_data)
+                spectral_future = executor.submit(self._analyze_spectral_array, analysis_audio, sr)
+                prosody_future = executor.submit(self._analyze_prosody_array, analysis_audio, sr)
+                model_score = model_future.result()
+                spectral_score = spectral_future.result()
+                prosody_score = prosody_future.result()
             
             # 1. AASIST model (if available)
-            model_score = self.analyze_with_model(audio_path)
             if model_score is not None:
                 method_scores[DetectionMethod.AASIST_MODEL] = model_score
                 model_weight = 0.6
@@ -475,12 +667,10 @@ class AudioDeepfakeDetector:
                 model_weight = 0.0
                 
             # 2. Spectral analysis (always available)
-            spectral_score = self.analyze_spectral_features(audio_path)
             method_scores[DetectionMethod.SPECTRAL_ANALYSIS] = spectral_score
             spectral_weight = 0.25 if model_weight > 0 else 0.6
             
             # 3. Prosody analysis
-            prosody_score = self.analyze_prosody(audio_path)
             method_scores[DetectionMethod.PROSODY_ANALYSIS] = prosody_score
             prosody_weight = 0.15 if model_weight > 0 else 0.4
             
@@ -510,7 +700,7 @@ class AudioDeepfakeDetector:
                 "audio_quality": "good" if audio_metadata.get("duration_seconds", 0) > 2.0 else "poor"
             }
             
-            logger.info(f"Audio analysis complete: deepfake={is_deepfake}, confidence={confidence:.3f}")
+            logger.info("Audio analysis complete: deepfake=%s, confidence=%.3f", is_deepfake, confidence)
             
             return AudioDetectionResult(
                 is_deepfake=is_deepfake,
@@ -558,6 +748,18 @@ class AudioDeepfakeDetector:
             except:
                 pass
 
+_detector: Optional[AudioDeepfakeDetector] = None
+_detector_lock = threading.Lock()
+
+def _get_detector() -> AudioDeepfakeDetector:
+    """The process-wide detector, built (model load, compile, warmup) on first use."""
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = AudioDeepfakeDetector()
+    return _detector
+
 # Backward compatibility function
 def deepfake_audio_detector(audio_path: str) -> Tuple[bool, float]:
     """
@@ -566,15 +768,11 @@ def deepfake_audio_detector(audio_path: str) -> Tuple[bool, float]:
     Returns:
         Tuple of (is_deepfake: bool, confidence: float)
     """
-    detector = AudioDeepfakeDetector()
-    result = detector.detect(audio_path)
+    # One shared detector: model inference is serialized by its model_lock, and the
+    # rest of detect() works on per-call arrays, so concurrent calls can share it
+    result = _get_detector().detect(audio_path)
     return result.is_deepfake, result.confidence
 
-# Context manager for mixed precision
-@contextmanager
-def _nullcontext():
-    yield
-
 # Example usage
 if __name__ == "__main__":
     detector = AudioDeepfakeDetector()
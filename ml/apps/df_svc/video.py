@@ -1,14 +1,18 @@
 # video_detect.py
 import os
-import tempfile
 import logging
+import functools
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, List, Dict, Optional, Any
 import numpy as np
 import cv2
 import mediapipe as mp
-from moviepy.editor import VideoFileClip
 import librosa
 import onnxruntime as ort
+from scipy.signal import correlate
 from dataclasses import dataclass
 from enum import Enum
 
@@ -16,6 +20,39 @@ from enum import Enum
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# TensorRT engines are built once per model and reused from this directory
+TRT_CACHE_DIR = os.getenv("DEEPFAKE_TRT_CACHE", "/tmp/trt_cache")
+# Prefer an INT8 model next to the FP32 one when present (set DEEPFAKE_ONNX_INT8=0 to disable):
+# "<model>.trt.quant.onnx" (symmetric QDQ) under TensorRT, "<model>.quant.onnx" on CPU-only hosts
+USE_INT8_MODEL = os.getenv("DEEPFAKE_ONNX_INT8", "1") == "1"
+# Faces per ONNX run; a fixed shape keeps kernels tuned once and caps peak memory
+ONNX_BATCH_SIZE = int(os.getenv("DEEPFAKE_ONNX_BATCH", "8"))
+# Concurrent session runs over mini-batches on the CPU provider (ORT never splits one
+# batch into parallel runs itself); each run gets cpu_count // max(2, N) intra-op threads
+ONNX_CONCURRENT_RUNS = int(os.getenv("DEEPFAKE_ONNX_CONCURRENCY", "2"))
+# Per-video analysis budget: long videos are sampled more sparsely instead of in full
+MAX_LANDMARK_SAMPLES = int(os.getenv("DEEPFAKE_MAX_LANDMARK_SAMPLES", "600"))
+MAX_FACE_SAMPLES = int(os.getenv("DEEPFAKE_MAX_FACE_SAMPLES", "60"))
+# Decoded frames buffered between the decode thread and FaceMesh
+FRAME_QUEUE_SIZE = 8
+
+# FaceMesh landmark indices
+# Face-oval boundary (~36 points) bounds the face; interior points cannot widen the box
+FACE_OVAL_INDICES = np.array(
+    sorted({i for pair in mp.solutions.face_mesh.FACEMESH_FACE_OVAL for i in pair}), dtype=np.int32
+)
+LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
+EYE_INDICES = np.array([LEFT_EYE_INDICES, RIGHT_EYE_INDICES])  # (2, 6)
+UPPER_LIP_INDEX, LOWER_LIP_INDEX = 13, 14
+# Landmarks any analysis reads (face oval, eyes, lips); only these are copied out of FaceMesh
+USED_LANDMARK_INDICES = np.unique(np.concatenate([
+    FACE_OVAL_INDICES, EYE_INDICES.ravel(), [UPPER_LIP_INDEX, LOWER_LIP_INDEX]
+]))
+_USED_LANDMARK_LIST = USED_LANDMARK_INDICES.tolist()  # plain ints for protobuf indexing
+# EAR point pairs within an eye: (p2, p6), (p3, p5), (p1, p4)
+EAR_FROM, EAR_TO = np.array([1, 2, 0]), np.array([5, 4, 3])
+
 class DetectionMethod(Enum):
     FACIAL_ANALYSIS = "facial_analysis"
     LIP_SYNC = "lip_sync"
@@ -29,18 +66,59 @@ class DetectionResult:
     method_scores: Dict[DetectionMethod, float]
     details: Dict[str, Any]
 
+@dataclass
+class VideoFeatures:
+    """Everything the analyses need from one ``_scan_video`` pass."""
+    faces: List[np.ndarray]          # RGB face crops for the model
+    eye_points: np.ndarray           # (S, 2, 6, 2) normalized eye landmarks for EAR
+    mouth_openings: List[float]      # mouth-opening series for lip sync
+    frame_shape: Tuple[int, int]     # (height, width) of the sampled frames
+
+    @classmethod
+    def empty(cls) -> "VideoFeatures":
+        return cls([], np.empty((0, *EYE_INDICES.shape, 2), dtype=np.float32), [], (0, 0))
+
+class _ProcessCanceller:
+    """Lets one thread kill a subprocess another thread may not have started yet."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self.cancelled = False
+
+    def start(self, cmd: List[str]) -> Optional[subprocess.Popen]:
+        """Start ``cmd`` with piped stdout/stderr, or return None if already cancelled."""
+        with self._lock:
+            if self.cancelled:
+                return None
+            self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            return self._proc
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.kill()
+
 class DeepfakeDetector:
-    def __init__(self, model_path: str = "", confidence_threshold: float = 0.5):
+    def __init__(self, model_path: str = "", confidence_threshold: float = 0.5,
+                 fast_mode: bool = False):
         """
         Initialize deepfake detector with optional ONNX model.
         
         Args:
             model_path: Path to ONNX model for frame classification
             confidence_threshold: Threshold for final classification
+            fast_mode: Skip lip-sync analysis (and its audio decode) entirely
         """
         self.model_path = model_path or os.getenv("DEEPFAKE_ONNX", "")
         self.confidence_threshold = confidence_threshold
+        self.fast_mode = fast_mode
         self.ort_session = None
+        self.ort_input_dtype = np.float32
+        self.ort_input_nhwc = False  # raw uint8 HWC faces, preprocessing fused into the graph
+        self._onnx_inputs = []  # reused mini-batch input buffers, one per concurrent run
+        self._onnx_lock = threading.Lock()
         self.face_mesh = None
         self._initialize_components()
         
@@ -51,7 +129,7 @@ class DeepfakeDetector:
             self.face_mesh = mp.solutions.face_mesh.FaceMesh(
                 static_image_mode=False,
                 max_num_faces=1,
-                refine_landmarks=True,
+                refine_landmarks=False,  # iris refinement unused: oval, eye and lip points are in the base 468
                 min_detection_confidence=0.5,
                 min_tracking_confidence=0.5
             )
@@ -63,93 +141,283 @@ class DeepfakeDetector:
         # Load ONNX model if available
         if self.model_path and os.path.exists(self.model_path):
             try:
-                providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+                so = ort.SessionOptions()
+                so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                so.intra_op_num_threads = max(1, (os.cpu_count() or 2) // max(2, ONNX_CONCURRENT_RUNS))
+                so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+                
+                # Prefer TensorRT with FP16 kernels when present, then CUDA, then CPU
+                # Heuristic cuDNN algo search: the fixed mini-batch shape needs no exhaustive autotune
+                providers = [
+                    ("CUDAExecutionProvider", {"cudnn_conv_algo_search": "HEURISTIC"}),
+                    "CPUExecutionProvider",
+                ]
+                model_path = self._select_model_file()
+                if "TensorrtExecutionProvider" in ort.get_available_providers():
+                    # QDQ INT8 models carry their own scales, so TensorRT needs no calibration table
+                    providers.insert(0, ("TensorrtExecutionProvider", {
+                        "trt_fp16_enable": True,
+                        "trt_int8_enable": model_path.endswith(".trt.quant.onnx"),
+                        "trt_engine_cache_enable": True,
+                        "trt_engine_cache_path": TRT_CACHE_DIR,
+                    }))
                 self.ort_session = ort.InferenceSession(
-                    self.model_path, 
+                    model_path, 
+                    sess_options=so,
                     providers=providers
                 )
-                logger.info(f"ONNX model loaded successfully from {self.model_path}")
+                model_input = self.ort_session.get_inputs()[0]
+                if model_input.type == "tensor(float16)":
+                    self.ort_input_dtype = np.float16
+                elif model_input.type == "tensor(uint8)":
+                    # scripts/fuse_deepfake_onnx_preprocessing.py models take N,H,W,3 pixels;
+                    # a uint8 NCHW input has no known pixel scaling, so it is rejected
+                    if model_input.shape[-1] != 3:
+                        raise ValueError(f"Unsupported uint8 input layout {model_input.shape}; "
+                                         "expected NHWC pixels from fuse_deepfake_onnx_preprocessing.py")
+                    self.ort_input_dtype = np.uint8
+                    self.ort_input_nhwc = True
+                logger.info("ONNX model loaded successfully from %s", model_path)
             except Exception as e:
                 logger.warning(f"Failed to load ONNX model: {e}")
                 self.ort_session = None
         else:
             logger.info("No ONNX model provided, using heuristic methods only")
 
-    def _extract_faces(self, video_path: str, target_fps: int = 1, 
-                      face_size: int = 224) -> List[np.ndarray]:
+    def _select_model_file(self) -> str:
         """
-        Extract face regions from video with improved face detection.
+        The INT8 model produced by scripts/quantize_deepfake_onnx.py when it exists
+        and it can run on INT8 kernels: the symmetric ``--trt`` variant under
+        TensorRT (which rejects QUInt8 activations with a nonzero zero point), the
+        default variant on CPU-only hosts (VNNI/dot-product kernels). Plain CUDA
+        would only dequantize it, so the configured FP32 model is used there.
+        """
+        if not USE_INT8_MODEL:
+            return self.model_path
+        base = os.path.splitext(self.model_path)[0]
+        available = ort.get_available_providers()
+        if "TensorrtExecutionProvider" in available:
+            quant_path = base + ".trt.quant.onnx"
+        elif "CUDAExecutionProvider" not in available:
+            quant_path = base + ".quant.onnx"
+        else:
+            return self.model_path
+        return quant_path if os.path.exists(quant_path) else self.model_path
+
+    def _frame_producer(self, cap, stride: int, frames: queue.Queue, stop: threading.Event):
+        """
+        Decode sampled frames on a background thread and queue them as RGB.
+        
+        Reads until ``cap.grab()`` fails rather than trusting the container's
+        frame count, which WebM/MKV/FLV often report as 0 or too low. Unsampled frames are skipped with ``cap.grab()``; sampled ones are decoded
+        with ``cap.retrieve()`` into one reused BGR buffer and converted into a
+        ring of RGB buffers. The ring is two slots larger than the queue, so a
+        slot is only overwritten after the consumer has moved past it. ``None``
+        marks the end of the stream.
+        """
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+            
+        ring = [None] * (frames.maxsize + 2)
+        slot = 0
+        frame = None
+        frame_idx = -1
+        try:
+            while not stop.is_set() and cap.grab():
+                frame_idx += 1
+                if frame_idx % stride != 0:
+                    continue
+                    
+                ret, decoded = cap.retrieve(frame)
+                if not ret or decoded is None:
+                    continue
+                frame = decoded
+                
+                rgb_frame = ring[slot]
+                if rgb_frame is None or rgb_frame.shape != frame.shape:
+                    rgb_frame = ring[slot] = np.empty_like(frame)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+                slot = (slot + 1) % len(ring)
+                
+                if not put((frame_idx, rgb_frame)):
+                    return
+        except Exception as e:
+            logger.error("Error decoding video frames: %s", e)
+        finally:
+            put(None)
+
+    def _scan_video(self, video_path: str, target_fps: float = 10, face_every: int = 10,
+                    face_size: int = 224):
+        """
+        Decode the video once and run FaceMesh once per sampled frame.
+        
+        A background thread (``_frame_producer``) skips frames with ``cap.grab()``,
+        decodes only sampled ones and converts them to RGB, so decoding overlaps
+        with FaceMesh on this thread. The landmarks of each sample serve the face
+        crops, the blink (EAR) series and the mouth-opening series alike.
         
         Args:
             video_path: Path to video file
-            target_fps: Target frames per second for sampling
+            target_fps: Sampling rate for landmarks
+            face_every: Keep a resized face crop on every N-th sample (0 disables crops)
             face_size: Size to resize faces to
             
-        Returns:
-            List of face images
+        Yields:
+            (frame_idx, (height, width), points, rgb_face_or_None) for every
+            sampled frame in which a face was found, where ``points`` is the
+            (N, 2) array of normalized landmark coordinates. ``points`` is one
+            buffer refilled per sample, so copy out what must outlive the step.
         """
-        faces = []
+        cap = cv2.VideoCapture(video_path)
+        producer = None
+        stop = threading.Event()
         try:
-            cap = cv2.VideoCapture(video_path)
             if not cap.isOpened():
                 raise ValueError(f"Could not open video: {video_path}")
                 
-            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps, total_frames = _get_video_meta(video_path)
+            fps = fps or 25.0
             stride = max(1, int(round(fps / target_fps)))
             
-            logger.info(f"Processing video: {total_frames} frames at {fps:.1f} FPS")
+            logger.info("Processing video: %d frames at %.1f FPS", total_frames, fps)
             
-            for frame_idx in range(0, total_frames, stride):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
+            frames = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+            producer = threading.Thread(
+                target=self._frame_producer,
+                args=(cap, stride, frames, stop),
+                daemon=True
+            )
+            producer.start()
+            
+            # Face-crop storage is allocated once per scan: resized crops are
+            # written straight into rows of one preallocated block (sized from
+            # the header frame count; extra crops are allocated individually)
+            face_store = None
+            if face_every > 0:
+                expected_faces = total_frames // stride // face_every + 1
+                face_store = np.empty((max(1, expected_faces), face_size, face_size, 3), dtype=np.uint8)
+            face_count = 0
+            sample_idx = 0
+            points = None  # landmark buffer, refilled in place for every sample
+            while True:
+                item = frames.get()
+                if item is None:
+                    break
+                frame_idx, rgb_frame = item
                 
-                if not ret or frame is None:
-                    continue
-                    
-                # Convert and process frame
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Run FaceMesh once per sample
                 results = self.face_mesh.process(rgb_frame)
                 
-                if results.multi_face_landmarks:
-                    face_roi = self._extract_face_region(frame, results.multi_face_landmarks[0])
+                keep_face = face_every > 0 and sample_idx % face_every == 0
+                sample_idx += 1
+                if not results.multi_face_landmarks:
+                    continue
+                    
+                points = self._landmarks_to_array(results.multi_face_landmarks[0], points)
+                face_resized = None
+                if keep_face:
+                    # Crop from the RGB frame FaceMesh already saw; the model wants RGB
+                    face_roi = self._extract_face_region(rgb_frame, points)
                     if face_roi is not None:
-                        face_resized = cv2.resize(face_roi, (face_size, face_size))
-                        faces.append(face_resized)
-            
+                        if face_count < len(face_store):
+                            face_resized = face_store[face_count]
+                            cv2.resize(face_roi, (face_size, face_size), dst=face_resized)
+                        else:  # frame count under-reported by the container
+                            face_resized = cv2.resize(face_roi, (face_size, face_size))
+                        face_count += 1
+                        
+                yield frame_idx, rgb_frame.shape[:2], points, face_resized
+        finally:
+            stop.set()
+            if producer is not None:
+                producer.join()
             cap.release()
-            logger.info(f"Extracted {len(faces)} faces from video")
+
+    def _extract_faces(self, video_path: str, target_fps: int = 1, 
+                      face_size: int = 224) -> List[np.ndarray]:
+        """
+        Extract face regions from video with improved face detection.
+        
+        Args:
+            video_path: Path to video file
+            target_fps: Target frames per second for sampling
+            face_size: Size to resize faces to
+            
+        Returns:
+            List of RGB face images
+        """
+        faces = []
+        try:
+            for _, _, _, face in self._scan_video(video_path, target_fps, face_every=1, face_size=face_size):
+                if face is not None:
+                    faces.append(face)
+            logger.info("Extracted %d faces from video", len(faces))
             
         except Exception as e:
             logger.error(f"Error extracting faces: {e}")
-            if 'cap' in locals():
-                cap.release()
                 
         return faces
 
-    def _extract_face_region(self, frame: np.ndarray, landmarks) -> Optional[np.ndarray]:
+    def _extract_features(self, video_path: str, target_fps: float = 10,
+                          face_every: int = 10) -> VideoFeatures:
+        """
+        Run one ``_scan_video`` pass and keep only what the analyses use: face
+        crops, the eye landmarks and the mouth-opening series. The full 468-point
+        landmark arrays are dropped as soon as each sample is reduced.
+        """
+        faces, eye_points, mouth_openings = [], [], []
+        frame_shape = (0, 0)
+        for _, shape, points, face in self._scan_video(video_path, target_fps, face_every=face_every):
+            frame_shape = shape
+            if face is not None:
+                faces.append(face)
+            eye_points.append(points[EYE_INDICES])
+            opening = self._mouth_opening_from_landmarks(points, *shape)
+            if opening is not None:
+                mouth_openings.append(opening)
+                
+        if not eye_points:
+            return VideoFeatures.empty()
+        return VideoFeatures(faces, np.stack(eye_points), mouth_openings, frame_shape)
+
+    def _landmarks_to_array(self, landmarks, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        FaceMesh landmarks as an (N, 2) float32 array of normalized (x, y).
+        
+        Only ``USED_LANDMARK_INDICES`` (~50 of the 468 points) are read from the
+        protobuf; the other rows are left as they are. Pass the previous result
+        as ``out`` to refill the same buffer instead of allocating one.
+        """
+        lms = landmarks.landmark
+        if out is None or len(out) != len(lms):
+            out = np.zeros((len(lms), 2), dtype=np.float32)
+        out[USED_LANDMARK_INDICES] = np.fromiter(
+            (c for i in _USED_LANDMARK_LIST for c in (lms[i].x, lms[i].y)),
+            dtype=np.float32, count=2 * len(_USED_LANDMARK_LIST)
+        ).reshape(-1, 2)
+        return out
+
+    def _extract_face_region(self, frame: np.ndarray, points: np.ndarray) -> Optional[np.ndarray]:
         """
         Extract face region from frame using landmarks with improved bounding box.
         """
         try:
             h, w = frame.shape[:2]
-            xs, ys = [], []
-            
-            # Use key facial landmarks for more stable bounding box
-            key_indices = list(range(468))  # All face mesh points
-            
-            for idx in key_indices:
-                if idx < len(landmarks.landmark):
-                    lm = landmarks.landmark[idx]
-                    xs.append(int(lm.x * w))
-                    ys.append(int(lm.y * h))
             
-            if not xs or not ys:
+            # Face-oval boundary points give the same box as the full mesh, more stably
+            if len(points) <= FACE_OVAL_INDICES.max():
                 return None
+            pts = points[FACE_OVAL_INDICES] * np.array([w, h], dtype=np.float32)
                 
             # Calculate bounding box with padding
-            x1, y1 = max(0, min(xs)), max(0, min(ys))
-            x2, y2 = min(w, max(xs)), min(h, max(ys))
+            x1, y1 = np.maximum(pts.min(axis=0).astype(int), 0)
+            x2, y2 = np.minimum(pts.max(axis=0).astype(int), (w, h))
             
             # Adaptive padding based on face size
             bbox_width = x2 - x1
@@ -175,29 +443,47 @@ class DeepfakeDetector:
 
     def _analyze_frames_with_model(self, faces: List[np.ndarray]) -> List[float]:
         """
-        Analyze faces using ONNX model with improved preprocessing.
+        Analyze RGB face crops (as produced by ``_scan_video``) using ONNX model
+        with improved preprocessing.
         """
         if self.ort_session is None or not faces:
             return []
             
         try:
-            # Preprocess faces
-            processed_faces = []
-            for face in faces:
-                # Convert to RGB and normalize
-                rgb_face = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
-                normalized_face = rgb_face.astype(np.float32) / 255.0
-                
-                # Standardize image (optional: add more preprocessing)
-                processed_faces.append(normalized_face)
-            
-            # Stack and transpose for model input
-            X = np.stack(processed_faces)  # N,H,W,3
-            X = np.transpose(X, (0, 3, 1, 2))  # N,3,H,W
-            
-            # Run inference
-            input_name = self.ort_session.get_inputs()[0].name
-            outputs = self.ort_session.run(None, {input_name: X})
+            # Each mini-batch of RGB HWC uint8 faces is written straight into one
+            # contiguous ONNX_BATCH_SIZE,3,H,W buffer (float32, or FP16 if the model
+            # was exported that way) that is reused across batches and calls; the
+            # scaled multiply lands in place, so there is no stack/transpose copy.
+            # Models with fused preprocessing take the uint8 faces as N,H,W,3.
+            # Short batches are zero-padded so the session only ever sees one shape.
+            h, w = faces[0].shape[:2]
+            on_cuda = "CUDAExecutionProvider" in self.ort_session.get_providers()
+            if self.ort_input_nhwc:
+                shape = (ONNX_BATCH_SIZE, h, w, 3)
+            else:
+                shape = (ONNX_BATCH_SIZE, 3, h, w)
+            chunks = [faces[i:i + ONNX_BATCH_SIZE] for i in range(0, len(faces), ONNX_BATCH_SIZE)]
+            
+            # The GPU serializes runs anyway; on CPU, mini-batches are split into
+            # lanes that each run sequentially on their own buffer, concurrently
+            # with the other lanes on the shared session (run() is thread-safe)
+            lanes = 1 if on_cuda else max(1, min(ONNX_CONCURRENT_RUNS, len(chunks)))
+            batch_outputs = [None] * len(chunks)
+            
+            def run_lane(lane: int):
+                X = self._onnx_inputs[lane]
+                for j in range(lane, len(chunks), lanes):
+                    batch_outputs[j] = self._run_model_batch(X, chunks[j], on_cuda)
+                    
+            with self._onnx_lock:
+                if len(self._onnx_inputs) < lanes or self._onnx_inputs[0].shape != shape:
+                    self._onnx_inputs = [np.empty(shape, dtype=self.ort_input_dtype) for _ in range(lanes)]
+                if lanes == 1:
+                    run_lane(0)
+                else:
+                    with ThreadPoolExecutor(max_workers=lanes) as pool:
+                        list(pool.map(run_lane, range(lanes)))
+            outputs = [np.concatenate(batch_outputs)]
             
             # Process outputs
             raw_scores = outputs[0].squeeze()
@@ -209,6 +495,28 @@ class DeepfakeDetector:
             logger.error(f"Error in model inference: {e}")
             return []
 
+    def _run_model_batch(self, X: np.ndarray, chunk: List[np.ndarray], on_cuda: bool) -> np.ndarray:
+        """Write one mini-batch of faces into the input buffer ``X`` and run the session on it."""
+        if self.ort_input_nhwc:
+            # Cast, scaling and the NCHW transpose run inside the graph
+            for i, face in enumerate(chunk):
+                X[i] = face
+        else:
+            for i, face in enumerate(chunk):
+                np.multiply(face.transpose(2, 0, 1), 1.0 / 255.0, out=X[i])
+        X[len(chunk):] = 0
+        
+        # Run inference through IOBinding so the input is bound, not copied via a feed dict
+        binding = self.ort_session.io_binding()
+        input_name = self.ort_session.get_inputs()[0].name
+        if on_cuda:
+            binding.bind_ortvalue_input(input_name, ort.OrtValue.ortvalue_from_numpy(X, "cuda", 0))
+        else:
+            binding.bind_cpu_input(input_name, X)
+        binding.bind_output(self.ort_session.get_outputs()[0].name)
+        self.ort_session.run_with_iobinding(binding)
+        return binding.copy_outputs_to_cpu()[0][:len(chunk)]
+
     def _process_model_outputs(self, raw_outputs: np.ndarray) -> List[float]:
         """Process model outputs to probabilities."""
         scores = []
@@ -224,91 +532,52 @@ class DeepfakeDetector:
             
         return scores
 
-    def _analyze_blink_patterns(self, video_path: str, target_fps: int = 10) -> Dict[str, float]:
+    def _analyze_blink_patterns(self, video_path: str, target_fps: float = 10,
+                                features: Optional[VideoFeatures] = None) -> Dict[str, float]:
         """
         Analyze blink patterns with improved EAR calculation and statistics.
+        
+        EAR is computed from the eye landmarks of ``_extract_features`` at
+        ``target_fps``; pass ``features`` to reuse them instead of decoding again.
         """
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return {"blink_rate": 0.0, "abnormality": 0.8}
-                
-            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-            stride = max(1, int(round(fps / target_fps)))
-            ear_values = []
-            
-            frame_idx = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            if features is None:
+                try:
+                    features = self._extract_features(video_path, target_fps, face_every=0)
+                except ValueError:  # video could not be opened
+                    return {"blink_rate": 0.0, "abnormality": 0.8}
                     
-                if frame_idx % stride == 0:
-                    ear = self._calculate_ear(frame)
-                    if ear is not None:
-                        ear_values.append(ear)
-                        
-                frame_idx += 1
+            if len(features.eye_points) == 0:
+                return self._compute_blink_statistics([], target_fps)
                 
-            cap.release()
+            # All samples share the frame size, so EAR is computed for every frame in one call
+            ear_values = self._ear_series(features.eye_points, *features.frame_shape)
             return self._compute_blink_statistics(ear_values, target_fps)
             
         except Exception as e:
             logger.error(f"Error in blink analysis: {e}")
             return {"blink_rate": 0.0, "abnormality": 0.7}
 
-    def _calculate_ear(self, frame: np.ndarray) -> Optional[float]:
-        """Calculate Eye Aspect Ratio with improved landmark selection."""
-        try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(rgb_frame)
-            
-            if not results.multi_face_landmarks:
-                return None
-                
-            landmarks = results.multi_face_landmarks[0].landmark
-            h, w = frame.shape[:2]
-            
-            def get_coord(index):
-                lm = landmarks[index]
-                return np.array([lm.x * w, lm.y * h])
-            
-            # Improved EAR calculation using more stable landmarks
-            # Left eye landmarks
-            left_eye_indices = [33, 160, 158, 133, 153, 144]
-            # Right eye landmarks  
-            right_eye_indices = [362, 385, 387, 263, 373, 380]
-            
-            left_ear = self._compute_ear_for_eye(left_eye_indices, get_coord)
-            right_ear = self._compute_ear_for_eye(right_eye_indices, get_coord)
-            
-            # Use average of both eyes
-            return (left_ear + right_ear) / 2.0
-            
-        except Exception as e:
-            logger.warning(f"Error calculating EAR: {e}")
-            return None
-
-    def _compute_ear_for_eye(self, indices: List[int], get_coord) -> float:
-        """Compute EAR for a single eye."""
-        try:
-            points = [get_coord(i) for i in indices]
-            
-            # EAR formula: (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
-            vertical1 = np.linalg.norm(points[1] - points[5])
-            vertical2 = np.linalg.norm(points[2] - points[4])
-            horizontal = np.linalg.norm(points[0] - points[3])
-            
-            return (vertical1 + vertical2) / (2.0 * horizontal + 1e-6)
-        except:
-            return 0.0
+    def _ear_series(self, eyes: np.ndarray, h: int, w: int) -> np.ndarray:
+        """
+        Eye Aspect Ratio per frame, averaged over both eyes, from stacked (S, 2, 6, 2)
+        normalized eye landmarks (``points[EYE_INDICES]``) of (h, w) frames. The
+        three distances ||p2-p6||, ||p3-p5|| and ||p1-p4|| are taken with one gather
+        and one ``np.hypot`` over all frames at once.
+        """
+        eyes = eyes * np.array([w, h], dtype=np.float32)
+        diff = eyes[..., EAR_FROM, :] - eyes[..., EAR_TO, :]  # (S, 2, 3, 2)
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        
+        ears = (dist[..., 0] + dist[..., 1]) / (2.0 * dist[..., 2] + 1e-6)
+        return ears.mean(axis=-1)
 
-    def _compute_blink_statistics(self, ear_values: List[float], target_fps: int) -> Dict[str, float]:
+    def _compute_blink_statistics(self, ear_values: np.ndarray, target_fps: float) -> Dict[str, float]:
         """Compute blink statistics from EAR values."""
         if len(ear_values) < 10:
             return {"blink_rate": 0.0, "abnormality": 0.6}
             
-        ear_array = np.array(ear_values)
+        ear_array = np.asarray(ear_values, dtype=np.float64)
         
         # Adaptive threshold based on data
         threshold = np.percentile(ear_array, 20) * 0.85
@@ -336,88 +605,86 @@ class DeepfakeDetector:
             "abnormality": float(np.clip(abnormality, 0.0, 1.0))
         }
 
-    def _analyze_lip_sync(self, video_path: str) -> float:
+    def _analyze_lip_sync(self, video_path: str, mouth_features: Optional[List[float]] = None) -> float:
         """
         Analyze lip-sync correlation with improved audio processing.
+        
+        ``mouth_features`` may be precomputed by ``_extract_features``;
+        otherwise the video's frames are scanned here.
         """
         try:
-            clip = VideoFileClip(video_path)
-            
-            if clip.audio is None:
-                return 0.6  # Suspicious if no audio with video
-                
             # Extract audio features
-            audio_features = self._extract_audio_features(clip)
-            mouth_features = self._extract_mouth_movement(clip)
-            
-            if len(audio_features) < 5 or len(mouth_features) < 5:
-                return 0.5
-                
-            sync_score = self._compute_sync_correlation(audio_features, mouth_features)
-            return sync_score
+            audio_features = self._extract_audio_features(video_path)
+            if audio_features is not None and mouth_features is None:
+                mouth_features = self._extract_mouth_movement(video_path)
+            return self._lip_sync_score(audio_features, mouth_features)
             
         except Exception as e:
             logger.error(f"Error in lip-sync analysis: {e}")
             return 0.5
-        finally:
-            if 'clip' in locals():
-                clip.close()
 
-    def _extract_audio_features(self, clip: VideoFileClip) -> np.ndarray:
-        """Extract audio envelope features."""
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_audio:
-            try:
-                clip.audio.write_audiofile(
-                    tmp_audio.name, 
-                    fps=16000, 
-                    verbose=False, 
-                    logger=None
-                )
-                y, sr = librosa.load(tmp_audio.name, sr=16000, mono=True)
-                
-                # Extract RMS energy with better smoothing
-                hop_length = 512
-                rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
-                rms_normalized = (rms - rms.min()) / (rms.max() - rms.min() + 1e-9)
-                
-                return rms_normalized
-            finally:
-                try:
-                    os.unlink(tmp_audio.name)
-                except:
-                    pass
-
-    def _extract_mouth_movement(self, clip: VideoFileClip) -> List[float]:
-        """Extract mouth movement time series."""
-        mouth_openings = []
-        step = max(1, int(round(clip.fps / 10)))  # ~10 Hz sampling
-        
-        for frame_idx, frame in enumerate(clip.iter_frames(fps=clip.fps)):
-            if frame_idx % step != 0:
-                continue
-                
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            results = self.face_mesh.process(cv2.cvtColor(rgb_frame, cv2.COLOR_BGR2RGB))
+    def _lip_sync_score(self, audio_features: Optional[np.ndarray], mouth_features: List[float]) -> float:
+        """Lip-sync mismatch from an audio envelope (None if no audio) and a mouth series."""
+        if audio_features is None:
+            return 0.6  # Suspicious if no audio with video
             
-            if results.multi_face_landmarks:
-                opening = self._calculate_mouth_opening(frame, results.multi_face_landmarks[0])
-                if opening is not None:
-                    mouth_openings.append(opening)
-                    
-        return mouth_openings
+        if len(audio_features) < 5 or len(mouth_features) < 5:
+            return 0.5
+            
+        return self._compute_sync_correlation(audio_features, mouth_features)
 
-    def _calculate_mouth_opening(self, frame: np.ndarray, landmarks) -> Optional[float]:
+    def _extract_audio_features(self, video_path: str, sr: int = 16000,
+                                canceller: Optional[_ProcessCanceller] = None) -> Optional[np.ndarray]:
+        """
+        Extract audio envelope features.
+        
+        ffmpeg decodes the first audio stream straight to mono float32 PCM on a
+        pipe, so no temp WAV is written and read back. Returns None when the
+        video has no audio stream, or when ``canceller`` killed the decode.
+        """
+        cmd = [
+            _ffmpeg_binary(), "-nostdin", "-loglevel", "error",
+            "-i", video_path, "-map", "0:a:0", "-vn", "-sn", "-dn",
+            "-f", "f32le", "-ac", "1", "-ar", str(sr), "pipe:1",
+        ]
+        canceller = canceller or _ProcessCanceller()
+        proc = canceller.start(cmd)
+        if proc is None:
+            return None
+        stdout, stderr = proc.communicate()
+        if canceller.cancelled:
+            return None
+        if proc.returncode != 0:
+            stderr = stderr.decode(errors="ignore")
+            if "matches no streams" in stderr:
+                return None
+            raise RuntimeError(f"ffmpeg audio extraction failed: {stderr.strip()}")
+        y = np.frombuffer(stdout, dtype=np.float32)
+        
+        # Extract RMS energy with better smoothing
+        hop_length = 512
+        rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
+        rms_normalized = (rms - rms.min()) / (rms.max() - rms.min() + 1e-9)
+        
+        return rms_normalized
+
+    def _extract_mouth_movement(self, video_path: str, target_fps: int = 10) -> List[float]:
+        """Extract mouth movement time series from a crop-free ``_scan_video`` pass."""
+        return self._extract_features(video_path, target_fps, face_every=0).mouth_openings
+
+    def _calculate_mouth_opening(self, frame: np.ndarray, points: np.ndarray) -> Optional[float]:
         """Calculate mouth opening metric."""
+        h, w = frame.shape[:2]
+        return self._mouth_opening_from_landmarks(points, h, w)
+
+    def _mouth_opening_from_landmarks(self, points: np.ndarray, h: int, w: int) -> Optional[float]:
+        """Calculate mouth opening metric from normalized landmark points of an (h, w) frame."""
         try:
-            h, w = frame.shape[:2]
-            
-            def get_coord(index):
-                lm = landmarks.landmark[index]
-                return np.array([lm.x * w, lm.y * h])
+            scale = np.array([w, h], dtype=np.float32)
             
             # Mouth corner and center landmarks
-            upper_lip = get_coord(13)
-            lower_lip = get_coord(14)
+            upper_lip = points[UPPER_LIP_INDEX] * scale
+            lower_lip = points[LOWER_LIP_INDEX] * scale
             
             mouth_open = np.linalg.norm(upper_lip - lower_lip) / max(h, 1)
             return float(mouth_open)
@@ -430,25 +697,44 @@ class DeepfakeDetector:
         """Compute lip-sync correlation score."""
         try:
             # Resample audio to match mouth series length
-            mouth_array = np.array(mouth)
-            audio_resampled = np.interp(
-                np.linspace(0, 1, len(mouth_array)),
-                np.linspace(0, 1, len(audio)),
-                audio
-            )
+            mouth_array = np.asarray(mouth, dtype=np.float64)
+            if len(audio) == len(mouth_array):
+                audio_resampled = np.asarray(audio, dtype=np.float64)
+            else:
+                audio_resampled = np.interp(
+                    np.linspace(0, 1, len(mouth_array)),
+                    np.linspace(0, 1, len(audio)),
+                    audio
+                )
             
-            # Compute cross-correlation for small lags
-            max_corr = -1
-            for lag in range(-3, 4):  # ±300ms at 10Hz
-                if lag < 0:
-                    corr = np.corrcoef(audio_resampled[:lag], mouth_array[-lag:])[0,1]
-                elif lag > 0:
-                    corr = np.corrcoef(audio_resampled[lag:], mouth_array[:-lag])[0,1]
-                else:
-                    corr = np.corrcoef(audio_resampled, mouth_array)[0,1]
-                    
-                if not np.isnan(corr):
-                    max_corr = max(max_corr, corr)
+            # Pearson correlation of the overlapping parts at each small lag, as
+            # np.corrcoef per lag would give, from one cross-correlation plus
+            # prefix sums. Padding one side by max_lag makes "valid" mode yield
+            # exactly the 2*max_lag+1 lagged dot products, each a direct O(N) pass.
+            max_lag = 3  # ±300ms at 10Hz
+            max_corr = -1  # stays -1 when every overlap is flat (correlation undefined)
+            audio_std, mouth_std = audio_resampled.std(), mouth_array.std()
+            if audio_std > 0 and mouth_std > 0:
+                # Global standardization doesn't change Pearson r; it only keeps the sums well scaled
+                a = (audio_resampled - audio_resampled.mean()) / audio_std
+                b = (mouth_array - mouth_array.mean()) / mouth_std
+                n = len(a)
+                sxy = correlate(np.pad(a, max_lag), b, mode="valid", method="direct")
+                ca = np.concatenate(([0.0], np.cumsum(a)))
+                ca2 = np.concatenate(([0.0], np.cumsum(a * a)))
+                cb = np.concatenate(([0.0], np.cumsum(b)))
+                cb2 = np.concatenate(([0.0], np.cumsum(b * b)))
+                for j, shift in enumerate(range(-max_lag, max_lag + 1)):
+                    m = n - abs(shift)  # overlap length
+                    if m < 2:
+                        continue
+                    a_lo, b_lo = max(shift, 0), max(-shift, 0)
+                    sa, sa2 = ca[a_lo + m] - ca[a_lo], ca2[a_lo + m] - ca2[a_lo]
+                    sb, sb2 = cb[b_lo + m] - cb[b_lo], cb2[b_lo + m] - cb2[b_lo]
+                    den = (sa2 - sa * sa / m) * (sb2 - sb * sb / m)
+                    if den <= 1e-12:
+                        continue  # flat overlap: np.corrcoef would give NaN
+                    max_corr = max(max_corr, float((sxy[j] - sa * sb / m) / np.sqrt(den)))
                     
             # Convert correlation to mismatch score
             mismatch = max(0.0, 1.0 - (max_corr + 1) / 2.0)
@@ -472,30 +758,87 @@ class DeepfakeDetector:
             raise FileNotFoundError(f"Video file not found: {video_path}")
             
         try:
-            logger.info(f"Starting deepfake analysis for: {video_path}")
+            logger.info("Starting deepfake analysis for: %s", video_path)
             
-            # Extract and analyze faces
-            faces = self._extract_faces(video_path, target_fps=1)
-            frame_scores = self._analyze_frames_with_model(faces)
+            # Container header only: reject unreadable files before any decoding
+            fps, total_frames = _get_video_meta(video_path)
+            if fps <= 0 and total_frames <= 0:
+                raise ValueError(f"Could not read video header: {video_path}")
+            video_duration = self._get_video_duration(video_path)
+            target_fps, face_every = self._sampling_plan(video_duration)
             
-            # Compute model confidence
-            if frame_scores:
-                model_confidence = float(np.median(frame_scores))
-                model_reliability = min(1.0, len(frame_scores) / 10.0)  # Scale by sample size
-                model_score = model_confidence * model_reliability
-            else:
-                model_score = 0.35  # Conservative default
+            executor = ThreadPoolExecutor(max_workers=3)
+            try:
+                # ffmpeg audio decode runs while the frames are scanned (skipped in fast mode)
+                audio_future = None
+                audio_canceller = _ProcessCanceller()
+                if not self.fast_mode:
+                    audio_future = executor.submit(self._extract_audio_features, video_path, 16000,
+                                                   audio_canceller)
+                
+                # Single decode + FaceMesh pass at up to 10 FPS; face crops kept at up to ~1 FPS.
+                # FaceMesh is not thread-safe, so it only ever runs on this thread.
+                try:
+                    features = self._extract_features(video_path, target_fps=target_fps, face_every=face_every)
+                except Exception as e:
+                    logger.error("Error scanning video frames: %s", e)
+                    features = VideoFeatures.empty()
+                faces = features.faces
+                logger.info("Extracted %d faces from video", len(faces))
+                
+                # Face model and blink statistics run concurrently (ONNX Runtime releases the GIL)
+                model_future = executor.submit(self._analyze_frames_with_model, faces)
+                blink_future = executor.submit(self._analyze_blink_patterns, video_path, target_fps, features)
+                frame_scores = model_future.result()
+                
+                # Compute model confidence
+                if frame_scores:
+                    model_confidence = float(np.median(frame_scores))
+                    model_reliability = min(1.0, len(frame_scores) / 10.0)  # Scale by sample size
+                    model_score = model_confidence * model_reliability
+                else:
+                    model_score = 0.35  # Conservative default
+                
+                # A confident model verdict on enough frames decides the outcome on its own
+                if len(frame_scores) >= 10 and (model_score > 0.9 or model_score < 0.1):
+                    # Kill the ffmpeg decode; cancel_futures alone can't stop a running task
+                    audio_canceller.cancel()
+                    is_deepfake = model_score >= self.confidence_threshold
+                    logger.info("Analysis complete: deepfake=%s, confidence=%.3f, early_exit=True",
+                                is_deepfake, model_score)
+                    return DetectionResult(
+                        is_deepfake=is_deepfake,
+                        confidence=float(np.clip(model_score, 0.0, 1.0)),
+                        method_scores={DetectionMethod.FACIAL_ANALYSIS: model_score},
+                        details={
+                            "faces_analyzed": len(faces),
+                            "frames_scored": len(frame_scores),
+                            "blink_rate": None,  # not computed on early exit
+                            "model_used": True,
+                            "early_exit": True
+                        }
+                    )
+                
+                if audio_future is None:
+                    lip_sync_mismatch = 0.5  # not analyzed; weighted out below
+                else:
+                    try:
+                        lip_sync_mismatch = self._lip_sync_score(audio_future.result(), features.mouth_openings)
+                    except Exception as e:
+                        logger.error("Error in lip-sync analysis: %s", e)
+                        lip_sync_mismatch = 0.5
+                blink_analysis = blink_future.result()
+            finally:
+                # Don't block an early exit on a still-running audio decode
+                executor.shutdown(wait=False, cancel_futures=True)
             
-            # Analyze other features
-            lip_sync_mismatch = self._analyze_lip_sync(video_path)
-            blink_analysis = self._analyze_blink_patterns(video_path)
             blink_abnormality = blink_analysis["abnormality"]
             
             # Weighted fusion with adaptive weights
             weights = self._compute_adaptive_weights(
                 has_model=len(frame_scores) > 0,
                 face_count=len(faces),
-                video_duration=self._get_video_duration(video_path)
+                video_duration=video_duration
             )
             
             # Compute final score
@@ -516,12 +859,13 @@ class DeepfakeDetector:
                 "faces_analyzed": len(faces),
                 "frames_scored": len(frame_scores),
                 "blink_rate": blink_analysis["blink_rate"],
-                "model_used": self.ort_session is not None
+                "model_used": self.ort_session is not None,
+                "early_exit": False
             }
             
             is_deepfake = final_score >= self.confidence_threshold
             
-            logger.info(f"Analysis complete: deepfake={is_deepfake}, confidence={final_score:.3f}")
+            logger.info("Analysis complete: deepfake=%s, confidence=%.3f", is_deepfake, final_score)
             
             return DetectionResult(
                 is_deepfake=is_deepfake,
@@ -545,7 +889,7 @@ class DeepfakeDetector:
         """Compute adaptive weights based on available data quality."""
         base_weights = {
             "model": 0.5 if has_model else 0.0,
-            "lip_sync": 0.3,
+            "lip_sync": 0.0 if self.fast_mode else 0.3,
             "blink": 0.2
         }
         
@@ -563,15 +907,28 @@ class DeepfakeDetector:
         if total > 0:
             return {k: v/total for k, v in base_weights.items()}
         else:
+            if self.fast_mode:
+                return {"model": 0.0, "lip_sync": 0.0, "blink": 1.0}
             return {"model": 0.0, "lip_sync": 0.5, "blink": 0.5}
 
+    def _sampling_plan(self, video_duration: float) -> Tuple[float, int]:
+        """
+        (target_fps, face_every) for the frame scan: 10 FPS landmarks with a face
+        crop every 10th sample (~1 FPS), thinned for long videos so a video yields
+        at most MAX_LANDMARK_SAMPLES landmark samples and MAX_FACE_SAMPLES faces.
+        """
+        target_fps, face_every = 10.0, 10
+        if video_duration <= 0:
+            return target_fps, face_every
+        target_fps = min(target_fps, MAX_LANDMARK_SAMPLES / video_duration)
+        samples = video_duration * target_fps
+        face_every = max(face_every, int(np.ceil(samples / MAX_FACE_SAMPLES)))
+        return target_fps, face_every
+
     def _get_video_duration(self, video_path: str) -> float:
         """Get video duration in seconds."""
         try:
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            cap.release()
+            fps, frame_count = _get_video_meta(video_path)
             
             if fps > 0 and frame_count > 0:
                 return frame_count / fps
@@ -584,6 +941,29 @@ class DeepfakeDetector:
         if self.face_mesh:
             self.face_mesh.close()
 
+@functools.lru_cache(maxsize=32)
+def _video_meta(video_path: str, mtime: float) -> Tuple[float, int]:
+    """(fps, frame_count) of a video; keyed by mtime so a rewritten file is re-read."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+def _get_video_meta(video_path: str) -> Tuple[float, int]:
+    """Cached (fps, frame_count) for ``video_path``."""
+    return _video_meta(video_path, os.stat(video_path).st_mtime)
+
+def _ffmpeg_binary() -> str:
+    """ffmpeg executable bundled with imageio-ffmpeg, else the one on PATH."""
+    try:
+        from imageio_ffmpeg import get_ffmpeg_exe
+        return get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+_detector_pool: "queue.SimpleQueue[DeepfakeDetector]" = queue.SimpleQueue()
+
 # Backward compatibility function
 def deepfake_video_detector(video_path: str) -> Tuple[bool, float]:
     """
@@ -592,8 +972,16 @@ def deepfake_video_detector(video_path: str) -> Tuple[bool, float]:
     Returns:
         Tuple of (is_deepfake: bool, confidence: float)
     """
-    detector = DeepfakeDetector()
-    result = detector.detect(video_path)
+    # Detectors (FaceMesh graph + ONNX session) are pooled and reused across calls;
+    # FaceMesh is not thread-safe, so each concurrent call checks out its own.
+    try:
+        detector = _detector_pool.get_nowait()
+    except queue.Empty:
+        detector = DeepfakeDetector()
+    try:
+        result = detector.detect(video_path)
+    finally:
+        _detector_pool.put(detector)
     return result.is_deepfake, result.confidence
 
 # Example usage
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -9,8 +10,44 @@ from docs.document_verifier import DocumentVerifier  # Assuming this is your doc
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Global verifier instance, created per worker process on startup (after fork)
+verifier = None
+
+def load_verifier() -> Optional[DocumentVerifier]:
+    """
+    Create this worker's verifier if it doesn't exist yet. Called from this app's
+    lifespan and from the startup hook of any app that serves
+    ``process_document_verification`` (``main.py``), so both share one instance.
+    """
+    global verifier
+    if verifier is None:
+        try:
+            verifier = DocumentVerifier()  # Assuming you have a DocumentVerifier class
+            logger.info("Document verifier loaded successfully")
+        except Exception as e:
+            logger.error("Failed to load verifier: %s", e)
+            verifier = None
+    return verifier
+
+async def close_verifier() -> None:
+    """Close the shared verifier's keep-alive HTTP session."""
+    global verifier
+    if verifier is not None:
+        await verifier.close()
+    verifier = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialize the verifier once per worker after fork (run with
+    ``uvicorn ... --workers N``) instead of at import time in the parent.
+    """
+    load_verifier()
+    yield
+    await close_verifier()
+
 # FastAPI instance
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -55,14 +92,6 @@ class VerifyResponse(BaseModel):
     suspicious_snippets: Optional[List[str]] = None  # Suspicious snippets found in the document
     meta: Dict[str, Any]  # Meta information about the verification process
 
-# Global verifier instance - initialize immediately
-try:
-    verifier = DocumentVerifier()  # Assuming you have a DocumentVerifier class
-    logger.info("Document verifier loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load verifier: {e}")
-    verifier = None
-
 # Health check endpoint
 @app.get("/health")
 async def health():
@@ -4,18 +4,50 @@ FastAPI microservice for text scam detection.
 Endpoint: POST /predict/text
 Input: {"text": "string"}
 Output: {"risk": float, "highlights": [...], "top_tokens": [...]}
+
+Scale out with one process per core, e.g.
+    uvicorn text_svc.main:app --workers $(nproc)
+Each worker loads and warms its own detector in the lifespan handler.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import logging
+import os
+import torch
 from text_svc.infer import TextScamDetector
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Text Scam Detection API", description="API for detecting scam in text", version="1.0.0")
+# Torch intra-op threads per worker; with --workers N, N * threads should not exceed the cores
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "1"))
+
+# Global detector instance
+detector = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the detector once per worker process (after fork) and warm it up."""
+    global detector
+    torch.set_num_threads(max(1, TORCH_NUM_THREADS))
+    try:
+        detector = TextScamDetector("models/text/model", "rules/text_keywords.yaml")
+        logger.info("Text scam detector loaded successfully")
+    except Exception as e:
+        logger.error("Failed to load detector: %s", e)
+        raise
+    try:
+        detector.predict("warmup")
+    except Exception as e:
+        logger.warning("Text scam detector warmup failed: %s", e)
+    yield
+    detector = None
+
+app = FastAPI(title="Text Scam Detection API", description="API for detecting scam in text", version="1.0.0",
+              lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -34,19 +66,6 @@ class PredictResponse(BaseModel):
     highlights: list[dict]
     top_tokens: list[str]
 
-# Global detector instance
-detector = None
-
-@app.on_event("startup")
-async def startup_event():
-    global detector
-    try:
-        detector = TextScamDetector("models/text/model", "rules/text_keywords.yaml")
-        logger.info("Text scam detector loaded successfully")
-    except Exception as e:
-        logger.error(f"Failed to load detector: {e}")
-        raise
-
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
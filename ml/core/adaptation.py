@@ -1,21 +1,28 @@
 import torch
 import torch.nn as nn
-from collections import deque
-import random
-from sklearn.metrics import roc_auc_score
+from sklearn.metrics import roc_auc_score, roc_curve
 import numpy as np
 
 class ReplayBuffer:
     def __init__(self, max_size=1000):
-        self.buffer = deque(maxlen=max_size)
+        self.max_size = max_size
+        self.buffer = []  # ring storage; the oldest sample is overwritten once full
+        self._next = 0
+        self._rng = np.random.default_rng()
 
     def add(self, sample):
         """Add a sample to the buffer. Sample should be a dict with 'input' and 'label'"""
-        self.buffer.append(sample)
+        if len(self.buffer) < self.max_size:
+            self.buffer.append(sample)
+        else:
+            self.buffer[self._next] = sample
+        self._next = (self._next + 1) % self.max_size
 
     def sample(self, batch_size):
-        """Sample a batch from the buffer"""
-        return random.sample(self.buffer, min(len(self.buffer), batch_size))
+        """Sample a batch from the buffer without replacement (O(batch_size) list indexing)"""
+        n = len(self.buffer)
+        indices = self._rng.choice(n, min(n, batch_size), replace=False)
+        return [self.buffer[i] for i in indices]
 
     def __len__(self):
         return len(self.buffer)
@@ -29,6 +36,7 @@ class AdaptationEngine:
         self.adaptation_interval = adaptation_interval_hours * 3600  # Convert to seconds
         self.last_adaptation_time = 0
         self.drift_threshold = 0.1  # TPR@1%FPR drop threshold
+        self.scaler = None  # GradScaler, created on first adaptation for the model's device
 
     def add_flagged_sample(self, sample):
         """Add a flagged sample from user reports to the replay buffer"""
@@ -47,32 +55,30 @@ class AdaptationEngine:
 
         with torch.no_grad():
             for batch in val_loader:
+                # Audio loaders ship float16 mels; the branches run in fp32
                 if 'input_values' in batch:  # Audio
-                    outputs = self.model.audio_branch(batch['input_values'])
+                    outputs = self.model.audio_branch(batch['input_values'].float())
                 elif 'pixel_values' in batch:  # Video
                     outputs = self.model.video_branch(batch['pixel_values'])
                 else:  # Fusion
-                    outputs = self.model(audio_input=batch.get('input_values'), video_input=batch.get('pixel_values'))
-
-                preds = torch.sigmoid(outputs.squeeze()).cpu().numpy()
-                all_preds.extend(preds)
-                all_labels.extend(batch['labels'].cpu().numpy())
+                    audio_input = batch.get('input_values')
+                    outputs = self.model(audio_input=audio_input.float() if audio_input is not None else None,
+                                         video_input=batch.get('pixel_values'))
 
-        # Calculate TPR@1%FPR (simplified)
-        fpr_threshold = 0.01
-        sorted_indices = np.argsort(all_preds)[::-1]
-        sorted_labels = np.array(all_labels)[sorted_indices]
+                all_preds.append(torch.sigmoid(outputs).reshape(-1).cpu().numpy())
+                all_labels.append(batch['labels'].reshape(-1).cpu().numpy())
 
-        cum_positives = np.cumsum(sorted_labels)
-        cum_negatives = np.arange(1, len(sorted_labels) + 1) - cum_positives
+        preds = np.concatenate(all_preds) if all_preds else np.zeros(0)
+        labels = np.concatenate(all_labels) if all_labels else np.zeros(0)
 
-        tpr_at_fpr = cum_positives[cum_negatives <= fpr_threshold * len(sorted_labels)]
-        if len(tpr_at_fpr) > 0:
-            current_tpr = tpr_at_fpr[-1] / cum_positives[-1] if cum_positives[-1] > 0 else 0
-        else:
-            current_tpr = 0
-
-        return current_tpr
+        # TPR@1%FPR read off the ROC curve; degenerate label sets have no curve
+        fpr_threshold = 0.01
+        if not labels.any():
+            return 0.0
+        if labels.all():
+            return 1.0
+        fpr, tpr, _ = roc_curve(labels, preds)
+        return float(np.interp(fpr_threshold, fpr, tpr))
 
     def adapt(self, current_time, val_loader=None):
         """Perform adaptation using replay buffer"""
@@ -92,30 +98,45 @@ class AdaptationEngine:
         self.model.train()
         adaptation_epochs = 3
 
+        # Mixed precision on CUDA; the scaler is a no-op elsewhere
+        device = next(self.model.parameters()).device
+        use_amp = device.type == 'cuda'
+        if self.scaler is None:
+            self.scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
+
         for epoch in range(adaptation_epochs):
             batch = self.buffer.sample(min(32, len(self.buffer)))
-            total_loss = 0
-
-            for sample in batch:
-                self.optimizer.zero_grad()
-
-                if 'input_values' in sample:  # Audio sample
-                    outputs = self.model.audio_branch(sample['input_values'].unsqueeze(0))
-                elif 'pixel_values' in sample:  # Video sample
-                    outputs = self.model.video_branch(sample['pixel_values'].unsqueeze(0))
-                else:  # Fusion sample
-                    outputs = self.model(
-                        audio_input=sample.get('input_values'),
-                        video_input=sample.get('pixel_values')
-                    )
-
-                loss = self.criterion(outputs.squeeze(), sample['label'].unsqueeze(0))
-                loss.backward()
-                self.optimizer.step()
-
-                total_loss += loss.item()
-
-            print(f"Adaptation epoch {epoch+1}/{adaptation_epochs}, Loss: {total_loss/len(batch):.4f}")
+            self.optimizer.zero_grad()
+
+            # One forward pass per branch/shape group instead of one per sample,
+            # and a single backward + optimizer step for the whole batch
+            with torch.autocast(device_type=device.type, enabled=use_amp):
+                loss = 0
+                for (kind, _), group in self._group_samples(batch).items():
+                    labels = torch.stack([sample['label'] for sample in group]).float().to(device, non_blocking=True)
+                    if kind == 'audio':
+                        inputs = torch.stack([sample['input_values'] for sample in group]).to(device, non_blocking=True)
+                        outputs = self.model.audio_branch(inputs.float())  # float16 mels from the loaders
+                    elif kind == 'video':
+                        inputs = torch.stack([sample['pixel_values'] for sample in group]).to(device, non_blocking=True)
+                        outputs = self.model.video_branch(inputs)
+                    else:  # Fusion samples carry no branch input to stack
+                        outputs = torch.cat([
+                            self.model(
+                                audio_input=sample['input_values'].float() if 'input_values' in sample else None,
+                                video_input=sample.get('pixel_values')
+                            ).reshape(-1)
+                            for sample in group
+                        ])
+
+                    group_loss = self.criterion(outputs.float().reshape(-1), labels.reshape(-1))
+                    loss = loss + group_loss * (len(group) / len(batch))
+
+            self.scaler.scale(loss).backward()
+            self.scaler.step(self.optimizer)
+            self.scaler.update()
+
+            print(f"Adaptation epoch {epoch+1}/{adaptation_epochs}, Loss: {loss.item():.4f}")
 
         # Evaluate after adaptation
         if val_loader:
@@ -128,6 +149,20 @@ class AdaptationEngine:
         print("Adaptation completed")
         return True
 
+    @staticmethod
+    def _group_samples(batch):
+        """Group samples by branch (audio/video/fusion) and input shape so each group stacks."""
+        groups = {}
+        for sample in batch:
+            if 'input_values' in sample:  # Audio sample
+                key = ('audio', tuple(sample['input_values'].shape))
+            elif 'pixel_values' in sample:  # Video sample
+                key = ('video', tuple(sample['pixel_values'].shape))
+            else:  # Fusion sample
+                key = ('fusion', ())
+            groups.setdefault(key, []).append(sample)
+        return groups
+
     def get_adaptation_stats(self):
         """Get statistics about the adaptation process"""
         return {
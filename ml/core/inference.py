@@ -3,12 +3,256 @@ import torch.nn as nn
 import torchvision.models as models
 from torchvision import transforms
 import logging
+import os
+import hashlib
+import tempfile
+import torchvision
+
+from utils.batching import MicroBatcher
 
 logger = logging.getLogger(__name__)
 
 # Global model instance
 _model = None
 
+# Trace/freeze the model with TorchScript at load time (set IMAGE_MODEL_JIT=0 to keep eager)
+USE_JIT = os.getenv("IMAGE_MODEL_JIT", "1") == "1"
+# PyTorch path: store nn.Linear weights as int8 via dynamic quantization (set IMAGE_MODEL_QUANTIZE=0 to keep fp32)
+USE_QUANTIZATION = os.getenv("IMAGE_MODEL_QUANTIZE", "1") == "1"
+INPUT_SHAPE = (1, 3, 224, 224)
+# Backbone weights and head size of the document classifier (contract, invoice, receipt, id_card, other)
+BACKBONE_WEIGHTS = models.ResNet50_Weights.IMAGENET1K_V1
+NUM_CLASSES = 5
+# Directory where the traced/frozen (or ONNX-exported) model is saved and reloaded on the
+# next boot (empty disables); defaults to a user-writable cache so non-root deployments work
+MODEL_CACHE_DIR = os.getenv(
+    "IMAGE_MODEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "image_model")
+)
+# torch.compile mode for the PyTorch model when TorchScript is disabled (IMAGE_MODEL_JIT=0); empty keeps eager
+COMPILE_MODE = os.getenv("IMAGE_MODEL_COMPILE_MODE", "reduce-overhead")
+# Serve the model from ONNX Runtime, exported once into MODEL_CACHE_DIR (set IMAGE_MODEL_ONNX=0 for PyTorch).
+# The ONNX path takes precedence and serves the fp32 graph: IMAGE_MODEL_JIT / IMAGE_MODEL_COMPILE_MODE /
+# IMAGE_MODEL_QUANTIZE only apply to the PyTorch fallback (ORT does its own graph optimization). ORT's
+# dynamic quantization would turn every conv into ConvInteger with uncalibrated activations, which is
+# slower on CPU; an int8 ORT graph needs static QDQ calibration (cf. scripts/quantize_deepfake_onnx.py).
+USE_ONNX = os.getenv("IMAGE_MODEL_ONNX", "1") == "1"
+
+def _cache_key():
+    """
+    Short digest of everything a cached artifact depends on (torch/torchvision
+    versions, backbone weights, head size), so a change invalidates old files.
+    """
+    tag = f"{torch.__version__}|{torchvision.__version__}|{BACKBONE_WEIGHTS}|{NUM_CLASSES}"
+    return hashlib.sha1(tag.encode()).hexdigest()[:12]
+
+def _write_atomically(path, write):
+    """
+    Call ``write(tmp_path)`` on a temp file in ``path``'s directory, then move it
+    into place with os.replace, so workers booting together never load a
+    half-written file. The temp file is removed if writing fails.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _cache_path():
+    """Path of the cached TorchScript artifact for the current optimization settings."""
+    if not USE_JIT or not MODEL_CACHE_DIR:
+        return None
+    suffix = "_int8" if USE_QUANTIZATION else ""
+    return os.path.join(MODEL_CACHE_DIR, f"image_model{suffix}-{_cache_key()}.pt")
+
+def _load_cached_model(path):
+    """Load a previously saved TorchScript model, or None if unavailable."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        model = torch.jit.load(path, map_location="cpu")
+        model.eval()
+        logger.info("Image model loaded from TorchScript cache %s", path)
+        return model
+    except Exception as e:
+        logger.warning("Could not load cached image model %s: %s", path, e)
+        return None
+
+def _save_cached_model(model, path):
+    """Persist the optimized TorchScript model so later processes skip trace/freeze."""
+    if not path or not isinstance(model, torch.jit.ScriptModule):
+        return
+    try:
+        _write_atomically(path, lambda tmp_path: torch.jit.save(model, tmp_path))
+        logger.info("Image model saved to TorchScript cache %s", path)
+    except Exception as e:
+        logger.warning("Could not save image model cache %s: %s", path, e)
+
+def _onnx_path():
+    """Path of the exported ONNX model, or None when the cache directory is disabled."""
+    if not USE_ONNX or not MODEL_CACHE_DIR:
+        return None
+    return os.path.join(MODEL_CACHE_DIR, f"image_model-{_cache_key()}.onnx")
+
+class OnnxImageModel:
+    """
+    Callable wrapper around one shared ONNX Runtime session with the same
+    tensor-in/tensor-out contract as the PyTorch model. Each call binds the
+    contiguous float32 input in place with IOBinding instead of building a
+    feed dict; ``InferenceSession.run`` is thread-safe, so the session is shared.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.output_name = session.get_outputs()[0].name
+
+    def __call__(self, image_tensor):
+        x = image_tensor.detach().to("cpu", torch.float32).contiguous().numpy()
+        binding = self.session.io_binding()
+        binding.bind_cpu_input(self.input_name, x)
+        binding.bind_output(self.output_name)
+        self.session.run_with_iobinding(binding)
+        return torch.from_numpy(binding.copy_outputs_to_cpu()[0])
+
+def _load_onnx_model():
+    """
+    Export the fp32 model to ONNX on first boot (reused afterwards), open it
+    with ONNX Runtime and run one warmup pass. Returns None, so the PyTorch
+    path is used, if onnxruntime is missing or any step fails.
+    """
+    path = _onnx_path()
+    if path is None:
+        return None
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logger.warning("onnxruntime not installed, serving the image model from PyTorch")
+        return None
+
+    try:
+        if not os.path.exists(path):
+            model = _build_model()
+
+            def export(tmp_path):
+                with torch.no_grad():
+                    torch.onnx.export(
+                        model, torch.zeros(*INPUT_SHAPE), tmp_path,
+                        input_names=["input"], output_names=["output"],
+                        dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+                        opset_version=17,
+                    )
+
+            _write_atomically(path, export)
+            logger.info("Image model exported to ONNX at %s", path)
+
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        available = ort.get_available_providers()
+        if "CUDAExecutionProvider" in available:
+            providers.insert(0, "CUDAExecutionProvider")
+        if "TensorrtExecutionProvider" in available:
+            providers.insert(0, ("TensorrtExecutionProvider", {"trt_fp16_enable": True}))
+        model = OnnxImageModel(ort.InferenceSession(path, sess_options=so, providers=providers))
+        model(torch.zeros(*INPUT_SHAPE))
+        logger.info("Image model served by ONNX Runtime (%s)", model.session.get_providers()[0])
+        return model
+    except Exception as e:
+        logger.warning("ONNX Runtime setup failed, serving the image model from PyTorch: %s", e)
+        return None
+
+def _quantize_linear(model):
+    """
+    Apply int8 dynamic quantization to the model's nn.Linear layers (CPU only).
+    Falls back to the fp32 model if the quantized engine is unavailable.
+    """
+    try:
+        if "fbgemm" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "fbgemm"
+        quantized = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        logger.info("Image model linear layers quantized to int8 (%s)", torch.backends.quantized.engine)
+        return quantized
+    except Exception as e:
+        logger.warning("Dynamic quantization failed, using fp32 model: %s", e)
+        return model
+
+def _optimize_for_inference(model):
+    """
+    Trace the eval-mode model with a fixed input, then freeze and optimize it
+    so constant weights are folded and per-op Python dispatch is skipped.
+    Falls back to the eager model if any step fails.
+    """
+    try:
+        with torch.no_grad():
+            traced = torch.jit.trace(model, torch.zeros(*INPUT_SHAPE))
+            traced = torch.jit.freeze(traced)
+    except Exception as e:
+        logger.warning("TorchScript optimization failed, using eager model: %s", e)
+        return model
+
+    try:
+        traced = torch.jit.optimize_for_inference(traced)
+    except Exception as e:
+        # Some ops (e.g. dynamically quantized linear) are not handled by every pass
+        logger.warning("optimize_for_inference failed, using frozen model: %s", e)
+    logger.info("Image model traced and frozen with TorchScript")
+    return traced
+
+def _build_model():
+    """
+    Build the eval-mode ResNet50 document classifier, falling back to a
+    minimal head if the pretrained weights cannot be loaded.
+    """
+    try:
+        # Load pre-trained ResNet50 model
+        model = models.resnet50(weights=BACKBONE_WEIGHTS)
+
+        # Modify the final layer for our use case (document classification)
+        # Original: 1000 classes (ImageNet)
+        # New: 5 classes (document types: contract, invoice, receipt, id_card, other)
+        num_features = model.fc.in_features
+        model.fc = nn.Linear(num_features, NUM_CLASSES)
+
+        # Set to evaluation mode
+        model.eval()
+
+        logger.info("Pre-trained ResNet50 model loaded successfully")
+    except Exception as e:
+        logger.error("Failed to load ResNet50 model: %s", e)
+        # Fallback to a simple model if ResNet fails to load
+        model = nn.Sequential(
+            nn.AdaptiveAvgPool2d((1, 1)),
+            nn.Flatten(),
+            nn.Linear(2048, NUM_CLASSES)  # ResNet50 feature size is 2048
+        )
+        model.eval()
+        logger.info("Fallback model loaded due to ResNet loading failure")
+    return model
+
+def _compile_model(model):
+    """
+    Compile the eager model with TorchInductor and run it once so compilation
+    happens at load time. Falls back to the eager model if compiling or the
+    first call fails.
+    """
+    if not COMPILE_MODE or not hasattr(torch, "compile"):
+        return model
+    try:
+        compiled = torch.compile(model, mode=COMPILE_MODE, dynamic=False)
+        with torch.inference_mode():
+            compiled(torch.zeros(*INPUT_SHAPE))
+        logger.info("Image model compiled with torch.compile (mode=%s)", COMPILE_MODE)
+        return compiled
+    except Exception as e:
+        logger.warning("torch.compile failed, using eager model: %s", e)
+        return model
+
 def load_model():
     """
     Load a pre-trained ResNet50 model for image classification.
@@ -16,33 +260,43 @@ def load_model():
     """
     global _model
     if _model is None:
-        try:
-            # Load pre-trained ResNet50 model
-            _model = models.resnet50(weights=models.ResNet50_Weights.IMAGENET1K_V1)
-
-            # Modify the final layer for our use case (document classification)
-            # Original: 1000 classes (ImageNet)
-            # New: 5 classes (document types: contract, invoice, receipt, id_card, other)
-            num_features = _model.fc.in_features
-            _model.fc = nn.Linear(num_features, 5)
-
-            # Set to evaluation mode
-            _model.eval()
-
-            logger.info("Pre-trained ResNet50 model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load ResNet50 model: {e}")
-            # Fallback to a simple model if ResNet fails to load
-            _model = nn.Sequential(
-                nn.AdaptiveAvgPool2d((1, 1)),
-                nn.Flatten(),
-                nn.Linear(2048, 5)  # ResNet50 feature size is 2048
-            )
-            _model.eval()
-            logger.info("Fallback model loaded due to ResNet loading failure")
+        _model = _load_onnx_model()
+        if _model is not None:
+            return _model
+
+        cache_path = _cache_path()
+        _model = _load_cached_model(cache_path)
+        if _model is not None:
+            return _model
+
+        _model = _build_model()
+        if USE_QUANTIZATION:
+            _model = _quantize_linear(_model)
+        if USE_JIT:
+            _model = _optimize_for_inference(_model)
+            _save_cached_model(_model, cache_path)
+        else:
+            _model = _compile_model(_model)
 
     return _model
 
+def is_model_loaded():
+    """Whether the image model is already in memory (never triggers a load)."""
+    return _model is not None
+
+def warmup_model(input_shape=INPUT_SHAPE, iterations=2):
+    """
+    Build the model and run dummy forward passes so weights, the allocator
+    caches and any lazy backend state are resident before the first request.
+    TorchScript specializes on its first calls, so more than one pass is used.
+    """
+    model = load_model()
+    with torch.inference_mode():
+        for _ in range(iterations):
+            model(torch.zeros(*input_shape))
+    logger.info("Image model warmed up with input shape %s", tuple(input_shape))
+    return model
+
 def run_inference(preprocessed_image):
     """
     Runs inference on the preprocessed image tensor.
@@ -55,10 +309,39 @@ def run_inference(preprocessed_image):
         Raw model predictions
     """
     model = load_model()
-    with torch.no_grad():
+    with torch.inference_mode():
         output = model(preprocessed_image)
     return output
 
+class InferenceBatcher(MicroBatcher):
+    """
+    Coalesces concurrent single-image inference calls into one batched forward pass.
+
+    Callers `await submit(tensor)` with a (3, H, W) tensor and get back its raw
+    predictions (1, num_classes); queued tensors are stacked into a reused input
+    buffer and run through `run_inference` once per batch (see MicroBatcher).
+    """
+
+    def __init__(self, max_batch_size=32, timeout_ms=5.0):
+        super().__init__(self._infer, max_batch_size=max_batch_size, timeout_ms=timeout_ms,
+                         name="image inference")
+        self._buffer = None
+
+    def _stack(self, tensors):
+        """
+        Stack (3, H, W) tensors into the preallocated (max_batch_size, 3, H, W)
+        buffer (pinned when CUDA is present) instead of allocating per batch.
+        Safe to reuse because MicroBatcher runs one batch at a time.
+        """
+        shape = (self.max_batch_size, *tensors[0].shape)
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = torch.empty(shape, dtype=tensors[0].dtype, pin_memory=torch.cuda.is_available())
+        return torch.stack(tensors, out=self._buffer[:len(tensors)])
+
+    def _infer(self, tensors):
+        outputs = run_inference(self._stack(tensors))
+        return [outputs[i:i + 1] for i in range(len(tensors))]
+
 def get_image_transforms():
     """
     Get the standard image transforms for ResNet50 preprocessing.
@@ -82,7 +365,7 @@ def predict_document_type(image_tensor):
         Dict with predictions and confidence scores
     """
     model = load_model()
-    with torch.no_grad():
+    with torch.inference_mode():
         outputs = model(image_tensor)
         probabilities = torch.nn.functional.softmax(outputs, dim=1)
 
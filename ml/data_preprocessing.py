@@ -1,23 +1,39 @@
 import os
 import torch
+import torch.nn as nn
 import torchaudio
 import torchvision.transforms as transforms
-from torch.utils.data import Dataset, DataLoader
-import librosa
+from torch.utils.data import Dataset, DataLoader, Sampler
 import numpy as np
-from PIL import Image
 import cv2
 import random
 from sklearn.model_selection import train_test_split
-import kagglehub
-import zipfile
-from pathlib import Path
+
+try:
+    import decord  # optional: decodes all sampled frames of a clip in one call
+    DECORD_AVAILABLE = True
+except ImportError:
+    DECORD_AVAILABLE = False
 
 class AudioDataset(Dataset):
     def __init__(self, audio_paths, labels, transform=None):
         self.audio_paths = audio_paths
         self.labels = labels
         self.transform = transform
+        # Mel filterbank/window built once per sample rate instead of per item
+        self._mel_cache = {}
+        self._to_db = torchaudio.transforms.AmplitudeToDB()
+
+    def _get_mel(self, sample_rate):
+        mel = self._mel_cache.get(sample_rate)
+        if mel is None:
+            mel = self._mel_cache[sample_rate] = torchaudio.transforms.MelSpectrogram(
+                sample_rate=sample_rate,
+                n_fft=1024,
+                hop_length=512,
+                n_mels=128
+            )
+        return mel
 
     def __len__(self):
         return len(self.audio_paths)
@@ -30,15 +46,10 @@ class AudioDataset(Dataset):
         waveform, sample_rate = torchaudio.load(audio_path)
 
         # Convert to mel-spectrogram
-        mel_spec = torchaudio.transforms.MelSpectrogram(
-            sample_rate=sample_rate,
-            n_fft=1024,
-            hop_length=512,
-            n_mels=128
-        )(waveform)
+        mel_spec = self._get_mel(sample_rate)(waveform)
 
         # Convert to log scale
-        mel_spec = torchaudio.transforms.AmplitudeToDB()(mel_spec)
+        mel_spec = self._to_db(mel_spec)
 
         # Normalize
         mel_spec = (mel_spec - mel_spec.mean()) / (mel_spec.std() + 1e-9)
@@ -46,26 +57,146 @@ class AudioDataset(Dataset):
         if self.transform:
             mel_spec = self.transform(mel_spec)
 
+        # Stored as float16: halves worker->main IPC and H2D bytes; restored to fp32 on the device
         return {
-            'input_values': mel_spec.squeeze(0),
+            'input_values': mel_spec.squeeze(0).half(),
             'labels': torch.tensor(label, dtype=torch.float)
         }
 
+# Raw-audio pipeline: fixed-length 16 kHz clips so waveforms stack into one batch
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_NUM_SAMPLES = 4 * AUDIO_SAMPLE_RATE
+
+class RawAudioDataset(Dataset):
+    """
+    Audio dataset that only decodes, downmixes, resamples and pads/crops to a
+    fixed length. Features are computed per batch by AudioBatchTransform, on
+    the training device, instead of per item in the loader workers.
+    """
+    def __init__(self, audio_paths, labels, sample_rate=AUDIO_SAMPLE_RATE, num_samples=AUDIO_NUM_SAMPLES):
+        self.audio_paths = audio_paths
+        self.labels = labels
+        self.sample_rate = sample_rate
+        self.num_samples = num_samples
+
+    def __len__(self):
+        return len(self.audio_paths)
+
+    def __getitem__(self, idx):
+        waveform, sample_rate = torchaudio.load(self.audio_paths[idx])
+        waveform = waveform.mean(dim=0)
+        if sample_rate != self.sample_rate:
+            waveform = torchaudio.functional.resample(waveform, sample_rate, self.sample_rate)
+
+        clip = torch.zeros(self.num_samples)
+        n = min(self.num_samples, waveform.shape[-1])
+        clip[:n] = waveform[:n]
+
+        return {
+            'waveform': clip,
+            'labels': torch.tensor(self.labels[idx], dtype=torch.float)
+        }
+
+class PackedAudioDataset(Dataset):
+    """
+    Batch-level dataset over waveforms packed by scripts/pack_asvspoof_audio.py.
+
+    Indexed with a range of rows (see ContiguousBatchSampler), it returns the
+    whole batch as one contiguous slice of a memory-mapped array: precomputed
+    float16 log-mels as {'input_values': (B, 128, frames)} when the pack has mels.npy
+    (written with --mels), otherwise waveforms as {'waveform': (B, T)} like
+    RawAudioDataset batches. Arrays are opened lazily so each loader worker
+    maps them itself.
+    """
+    def __init__(self, pack_dir):
+        self.pack_dir = pack_dir
+        self.labels = np.load(os.path.join(pack_dir, 'labels.npy'))
+        if os.path.exists(os.path.join(pack_dir, 'mels.npy')):
+            self._file, self._key = 'mels.npy', 'input_values'
+        else:
+            self._file, self._key = 'waveforms.npy', 'waveform'
+        self._data = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, rows):
+        if self._data is None:
+            self._data = np.load(os.path.join(self.pack_dir, self._file), mmap_mode='r')
+        return {
+            self._key: torch.from_numpy(np.array(self._data[rows.start:rows.stop])),
+            'labels': torch.from_numpy(self.labels[rows.start:rows.stop])
+        }
+
+class ContiguousBatchSampler(Sampler):
+    """Yields row ranges of batch_size; packed rows are pre-shuffled, so only the batch order is shuffled."""
+    def __init__(self, num_rows, batch_size, shuffle=False):
+        self.num_rows = num_rows
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+
+    def __len__(self):
+        return (self.num_rows + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        starts = np.arange(0, self.num_rows, self.batch_size)
+        if self.shuffle:
+            np.random.shuffle(starts)
+        for start in starts:
+            yield range(int(start), min(int(start) + self.batch_size, self.num_rows))
+
+class AudioBatchTransform(nn.Module):
+    """
+    Mel-spectrogram, dB conversion and per-sample normalization for a whole
+    (B, T) waveform batch in one pass, on whatever device the module lives on.
+    Produces the same (B, 128, frames) features as AudioDataset.
+    """
+    def __init__(self, sample_rate=AUDIO_SAMPLE_RATE):
+        super().__init__()
+        self.mel = torchaudio.transforms.MelSpectrogram(
+            sample_rate=sample_rate,
+            n_fft=1024,
+            hop_length=512,
+            n_mels=128
+        )
+        self.to_db = torchaudio.transforms.AmplitudeToDB()
+
+    def forward(self, waveform):
+        mel_spec = self.to_db(self.mel(waveform))
+        mean = mel_spec.mean(dim=(-2, -1), keepdim=True)
+        std = mel_spec.std(dim=(-2, -1), keepdim=True)
+        return (mel_spec - mean) / (std + 1e-9)
+
+# ImageNet statistics used to normalize video frames
+VIDEO_MEAN = [0.485, 0.456, 0.406]
+VIDEO_STD = [0.229, 0.224, 0.225]
+
 class VideoDataset(Dataset):
-    def __init__(self, video_paths, labels, transform=None, num_frames=16):
+    def __init__(self, video_paths, labels, transform=None, num_frames=16, raw=False, frame_size=224):
         self.video_paths = video_paths
         self.labels = labels
+        # transform: applied once per clip to a uint8 [T, 3, H, W] tensor
         self.transform = transform
         self.num_frames = num_frames
+        # raw=True: return uint8 [C, T, frame_size, frame_size] clips for VideoBatchTransform
+        self.raw = raw
+        self.frame_size = frame_size
 
     def __len__(self):
         return len(self.video_paths)
 
-    def __getitem__(self, idx):
-        video_path = self.video_paths[idx]
-        label = self.labels[idx]
+    def _read_frames(self, video_path):
+        """num_frames evenly spaced RGB uint8 frames, decoded in a single pass over the clip."""
+        if DECORD_AVAILABLE:
+            try:
+                vr = decord.VideoReader(video_path, num_threads=1)
+                if len(vr) == 0:
+                    return []
+                frame_indices = np.linspace(0, len(vr) - 1, self.num_frames, dtype=int)
+                return list(vr.get_batch(frame_indices).asnumpy())
+            except Exception:
+                pass  # fall back to OpenCV for containers decord cannot open
 
-        # Load video
         cap = cv2.VideoCapture(video_path)
         frames = []
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -73,65 +204,155 @@ class VideoDataset(Dataset):
         # Sample frames evenly
         frame_indices = np.linspace(0, total_frames-1, self.num_frames, dtype=int)
 
-        for i in frame_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            ret, frame = cap.read()
+        # Walk the stream once: grab() every frame, but only decode the sampled
+        # ones with retrieve() instead of seeking and reading each one
+        wanted = np.bincount(frame_indices) if total_frames > 0 else np.zeros(0, dtype=int)
+        for i in range(len(wanted)):
+            if not cap.grab():
+                break
+            if wanted[i] == 0:
+                continue
+            ret, frame = cap.retrieve()
             if ret:
                 frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame = Image.fromarray(frame)
-                frames.append(frame)
+                frames.extend([frame] * wanted[i])
 
         cap.release()
+        return frames
+
+    def _raw_clip(self, video_path):
+        """uint8 [C, T, H, W] clip resized in the worker only so clips stack; float math is left to the device."""
+        size = (self.frame_size, self.frame_size)
+        clip = np.zeros((self.num_frames, self.frame_size, self.frame_size, 3), dtype=np.uint8)
+        frames = self._read_frames(video_path)
+        for t in range(self.num_frames):
+            if t < len(frames):
+                cv2.resize(frames[t], size, dst=clip[t], interpolation=cv2.INTER_AREA)
+            elif frames:
+                clip[t] = clip[len(frames) - 1]  # duplicate last frame
+        return torch.from_numpy(clip).permute(3, 0, 1, 2)
+
+    def __getitem__(self, idx):
+        video_path = self.video_paths[idx]
+        label = self.labels[idx]
+
+        if self.raw:
+            return {
+                'pixel_values': self._raw_clip(video_path),
+                'labels': torch.tensor(label, dtype=torch.float)
+            }
+
+        # Load video as one uint8 [T, H, W, 3] array (no per-frame PIL images)
+        frames = self._read_frames(video_path)
 
         # If not enough frames, duplicate last frame
-        while len(frames) < self.num_frames:
-            frames.append(frames[-1] if frames else Image.new('RGB', (224, 224)))
+        if frames:
+            frames = frames + [frames[-1]] * (self.num_frames - len(frames))
+            clip = torch.from_numpy(np.stack(frames)).permute(0, 3, 1, 2)  # [T, 3, H, W]
+        else:
+            clip = torch.zeros(self.num_frames, 3, 224, 224, dtype=torch.uint8)
 
-        # Apply transforms
+        # Apply tensor transforms to the whole clip at once
         if self.transform:
-            frames = [self.transform(frame) for frame in frames]
+            clip = self.transform(clip)
 
-        # Stack frames
-        video_tensor = torch.stack(frames, dim=1)  # [C, T, H, W]
+        video_tensor = clip.transpose(0, 1)  # [C, T, H, W]
 
         return {
             'pixel_values': video_tensor,
             'labels': torch.tensor(label, dtype=torch.float)
         }
 
+class PackedVideoDataset(Dataset):
+    """
+    Clips decoded once by scripts/pack_dfdc_video.py: each item is a copy of one
+    row of a memory-mapped uint8 (N, C, T, H, W) array, in the same
+    {'pixel_values', 'labels'} form as VideoDataset(raw=True), so no video is
+    decoded during training. The array is opened lazily so each loader worker
+    maps it itself.
+    """
+    def __init__(self, pack_dir):
+        self.pack_dir = pack_dir
+        self.labels = np.load(os.path.join(pack_dir, 'labels.npy'))
+        self._clips = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        if self._clips is None:
+            self._clips = np.load(os.path.join(self.pack_dir, 'clips.npy'), mmap_mode='r')
+        return {
+            'pixel_values': torch.from_numpy(np.array(self._clips[idx])),
+            'labels': torch.tensor(self.labels[idx], dtype=torch.float)
+        }
+
+class VideoBatchTransform(nn.Module):
+    """
+    Scale and normalize a whole uint8 (B, C, T, H, W) clip batch in one pass on
+    whatever device the module lives on; matches VideoDataset's ConvertImageDtype
+    + Normalize output.
+    """
+    def __init__(self, mean=VIDEO_MEAN, std=VIDEO_STD):
+        super().__init__()
+        self.register_buffer('mean', torch.tensor(mean).view(1, -1, 1, 1, 1))
+        self.register_buffer('std', torch.tensor(std).view(1, -1, 1, 1, 1))
+
+    def forward(self, frames):
+        return frames.float().div_(255.0).sub_(self.mean).div_(self.std)
+
+def _find_files(root, suffix):
+    """
+    Sorted (directory, path) pairs for files under `root` ending with `suffix`.
+    Walks with os.scandir, whose DirEntry type checks need no extra stat calls.
+    """
+    found = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    found.append((directory, entry.path))
+    found.sort(key=lambda item: item[1])
+    return found
+
+def _label_files(found, real_marker):
+    """Paths and labels (0 when `real_marker` is in the directory path, 1 otherwise), decided once per directory."""
+    dir_labels = {}
+    paths, labels = [], []
+    for directory, path in found:
+        label = dir_labels.get(directory)
+        if label is None:
+            label = dir_labels[directory] = 0 if real_marker in directory else 1
+        paths.append(path)
+        labels.append(label)
+    return paths, labels
+
 def load_asvspoof2019(data_dir):
     """Load ASVspoof 2019 dataset"""
     # This is a placeholder - actual implementation would depend on dataset structure
     # Assume data_dir contains train/, dev/, eval/ subdirs with audio files and labels
-    audio_paths = []
-    labels = []
-
+    found = []
     for split in ['train', 'dev']:
         split_dir = os.path.join(data_dir, split)
         if os.path.exists(split_dir):
-            for root, _, files in os.walk(split_dir):
-                for file in files:
-                    if file.endswith('.wav'):
-                        audio_paths.append(os.path.join(root, file))
-                        # Label: 0 for bona fide, 1 for spoof
-                        labels.append(0 if 'bonafide' in root else 1)
+            found.extend(_find_files(split_dir, '.wav'))
 
-    return audio_paths, labels
+    # Label: 0 for bona fide, 1 for spoof
+    return _label_files(found, 'bonafide')
 
 def load_dfdc(data_dir):
     """Load DFDC dataset"""
     # Placeholder for DFDC loading
-    video_paths = []
-    labels = []
-
     # Assume similar structure
-    for root, _, files in os.walk(data_dir):
-        for file in files:
-            if file.endswith('.mp4'):
-                video_paths.append(os.path.join(root, file))
-                labels.append(0 if 'REAL' in root else 1)
-
-    return video_paths, labels
+    return _label_files(_find_files(data_dir, '.mp4'), 'REAL')
 
 def download_datasets(data_dir):
     """Download datasets using kagglehub or other methods"""
@@ -139,6 +360,7 @@ def download_datasets(data_dir):
 
     # ASVspoof 2019
     try:
+        import kagglehub  # only needed here; keeps the heavy import out of every user of this module
         asv_path = kagglehub.dataset_download("asvspoof/asv-spoof-2019-dataset")
         print(f"ASVspoof downloaded to: {asv_path}")
     except:
@@ -147,62 +369,168 @@ def download_datasets(data_dir):
     # DFDC - this might require manual download due to size
     print("DFDC dataset is large - please download manually from https://www.kaggle.com/c/deepfake-detection-challenge")
 
-def get_data_loaders(data_dir, batch_size=16):
-    """Create data loaders for training"""
+def _seed_worker(worker_id):
+    """
+    Seed Python and NumPy RNGs from the worker's torch seed so augment_audio /
+    augment_video draw independent randomness in each loader worker.
+    """
+    seed = torch.initial_seed() % 2**32
+    np.random.seed(seed)
+    random.seed(seed)
+
+def _loader_kwargs(num_workers=None):
+    """
+    DataLoader settings shared by all loaders: worker processes kept alive across
+    epochs with batches prefetched ahead, and page-locked batches when CUDA is
+    present so `.to(device, non_blocking=True)` copies overlap with compute.
+    """
+    if num_workers is None:
+        num_workers = min(8, os.cpu_count() or 1)
+    kwargs = {'num_workers': num_workers, 'pin_memory': torch.cuda.is_available()}
+    if num_workers > 0:
+        kwargs.update(persistent_workers=True, prefetch_factor=4, worker_init_fn=_seed_worker)
+    return kwargs
+
+class CUDAPrefetcher:
+    """
+    Wraps a DataLoader of dict batches and copies the next batch to the GPU on a
+    side stream while the current one is being consumed, so host-to-device
+    transfers overlap with compute. Re-iterable per epoch like the loader itself.
+    """
+    def __init__(self, loader, device='cuda'):
+        self.loader = loader
+        self.device = torch.device(device)
+
+    def __len__(self):
+        return len(self.loader)
+
+    def _to_device(self, batch, stream):
+        with torch.cuda.stream(stream):
+            return {k: v.to(self.device, non_blocking=True) if torch.is_tensor(v) else v
+                    for k, v in batch.items()}
+
+    def __iter__(self):
+        stream = torch.cuda.Stream(device=self.device)
+        batches = iter(self.loader)
+        next_batch = next(batches, None)
+        if next_batch is not None:
+            next_batch = self._to_device(next_batch, stream)
+        while next_batch is not None:
+            torch.cuda.current_stream(self.device).wait_stream(stream)
+            batch = next_batch
+            for v in batch.values():
+                if torch.is_tensor(v):
+                    # Allocated on the side stream, used on the default one
+                    v.record_stream(torch.cuda.current_stream(self.device))
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                next_batch = self._to_device(next_batch, stream)
+            yield batch
+
+def get_data_loaders(data_dir, batch_size=16, raw_audio=False, raw_video=False, num_workers=None,
+                     packed_audio_dir=None, packed_video_dir=None, device=None):
+    """
+    Create data loaders for training.
+
+    With raw_audio=True the audio loaders yield fixed-length 'waveform' batches
+    (RawAudioDataset) to be featurized on the training device with
+    AudioBatchTransform, instead of per-item mel 'input_values'. With
+    raw_video=True the video loaders yield uint8 clips to be normalized on the
+    device with VideoBatchTransform. num_workers defaults to min(8, cpu_count).
+    packed_audio_dir (output of scripts/pack_asvspoof_audio.py) serves audio as
+    whole contiguous 'waveform' batches from memory-mapped arrays instead, and
+    packed_video_dir (output of scripts/pack_dfdc_video.py) serves pre-decoded
+    uint8 clips like raw_video=True without decoding any video.
+    With a CUDA `device` every loader is wrapped in CUDAPrefetcher and yields
+    batches already on that device.
+    """
     # Download datasets if needed
     download_datasets(data_dir)
+    loader_kwargs = _loader_kwargs(num_workers)
 
     # Load audio data
-    audio_paths, audio_labels = load_asvspoof2019(os.path.join(data_dir, 'asv-spoof-2019'))
-    if audio_paths:
+    if packed_audio_dir:
+        audio_paths, audio_labels = [], []
+    else:
+        audio_paths, audio_labels = load_asvspoof2019(os.path.join(data_dir, 'asv-spoof-2019'))
+    if packed_audio_dir:
+        # Batches come straight from the dataset, so automatic batching/collation is off
+        audio_train_dataset = PackedAudioDataset(os.path.join(packed_audio_dir, 'train'))
+        audio_val_dataset = PackedAudioDataset(os.path.join(packed_audio_dir, 'val'))
+        audio_train_loader = DataLoader(
+            audio_train_dataset, batch_size=None,
+            sampler=ContiguousBatchSampler(len(audio_train_dataset), batch_size, shuffle=True), **loader_kwargs
+        )
+        audio_val_loader = DataLoader(
+            audio_val_dataset, batch_size=None,
+            sampler=ContiguousBatchSampler(len(audio_val_dataset), batch_size), **loader_kwargs
+        )
+    elif audio_paths:
         audio_train_paths, audio_val_paths, audio_train_labels, audio_val_labels = train_test_split(
             audio_paths, audio_labels, test_size=0.2, random_state=42
         )
 
-        audio_transform = transforms.Compose([
-            transforms.Normalize(mean=[0.0], std=[1.0])
-        ])
-
-        audio_train_dataset = AudioDataset(audio_train_paths, audio_train_labels, audio_transform)
-        audio_val_dataset = AudioDataset(audio_val_paths, audio_val_labels, audio_transform)
+        if raw_audio:
+            audio_train_dataset = RawAudioDataset(audio_train_paths, audio_train_labels)
+            audio_val_dataset = RawAudioDataset(audio_val_paths, audio_val_labels)
+        else:
+            # Features are already normalized per clip in AudioDataset; no extra transform
+            audio_train_dataset = AudioDataset(audio_train_paths, audio_train_labels)
+            audio_val_dataset = AudioDataset(audio_val_paths, audio_val_labels)
 
-        audio_train_loader = DataLoader(audio_train_dataset, batch_size=batch_size, shuffle=True)
-        audio_val_loader = DataLoader(audio_val_dataset, batch_size=batch_size, shuffle=False)
+        audio_train_loader = DataLoader(audio_train_dataset, batch_size=batch_size, shuffle=True, **loader_kwargs)
+        audio_val_loader = DataLoader(audio_val_dataset, batch_size=batch_size, shuffle=False, **loader_kwargs)
     else:
         audio_train_loader = audio_val_loader = None
 
     # Load video data
-    video_paths, video_labels = load_dfdc(os.path.join(data_dir, 'dfdc'))
-    if video_paths:
+    if packed_video_dir:
+        video_paths, video_labels = [], []
+    else:
+        video_paths, video_labels = load_dfdc(os.path.join(data_dir, 'dfdc'))
+    if packed_video_dir:
+        video_train_dataset = PackedVideoDataset(os.path.join(packed_video_dir, 'train'))
+        video_val_dataset = PackedVideoDataset(os.path.join(packed_video_dir, 'val'))
+        video_train_loader = DataLoader(video_train_dataset, batch_size=batch_size, shuffle=True, **loader_kwargs)
+        video_val_loader = DataLoader(video_val_dataset, batch_size=batch_size, shuffle=False, **loader_kwargs)
+    elif video_paths:
         video_train_paths, video_val_paths, video_train_labels, video_val_labels = train_test_split(
             video_paths, video_labels, test_size=0.2, random_state=42
         )
 
-        video_transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
-
-        video_train_dataset = VideoDataset(video_train_paths, video_train_labels, video_transform)
-        video_val_dataset = VideoDataset(video_val_paths, video_val_labels, video_transform)
-
-        video_train_loader = DataLoader(video_train_dataset, batch_size=batch_size, shuffle=True)
-        video_val_loader = DataLoader(video_val_dataset, batch_size=batch_size, shuffle=False)
+        if raw_video:
+            video_train_dataset = VideoDataset(video_train_paths, video_train_labels, raw=True)
+            video_val_dataset = VideoDataset(video_val_paths, video_val_labels, raw=True)
+        else:
+            # Tensor transforms over the whole uint8 [T, 3, H, W] clip
+            video_transform = transforms.Compose([
+                transforms.Resize((224, 224), antialias=True),
+                transforms.ConvertImageDtype(torch.float32),
+                transforms.Normalize(mean=VIDEO_MEAN, std=VIDEO_STD)
+            ])
+
+            video_train_dataset = VideoDataset(video_train_paths, video_train_labels, video_transform)
+            video_val_dataset = VideoDataset(video_val_paths, video_val_labels, video_transform)
+
+        video_train_loader = DataLoader(video_train_dataset, batch_size=batch_size, shuffle=True, **loader_kwargs)
+        video_val_loader = DataLoader(video_val_dataset, batch_size=batch_size, shuffle=False, **loader_kwargs)
     else:
         video_train_loader = video_val_loader = None
 
-    return {
+    loaders = {
         'audio_train': audio_train_loader,
         'audio_val': audio_val_loader,
         'video_train': video_train_loader,
         'video_val': video_val_loader
     }
+    if device is not None and torch.device(device).type == 'cuda':
+        loaders = {name: CUDAPrefetcher(loader, device) if loader is not None else None
+                   for name, loader in loaders.items()}
+    return loaders
 
 # Augmentation functions
 def add_noise(waveform, noise_factor=0.005):
-    noise = torch.randn_like(waveform) * noise_factor
-    return waveform + noise
+    return torch.randn_like(waveform).mul_(noise_factor).add_(waveform)
 
 def time_stretch(waveform, rate=1.1):
     return torchaudio.transforms.TimeStretch()(waveform.unsqueeze(0)).squeeze(0)
@@ -214,18 +542,15 @@ def codec_compression_audio(waveform, sample_rate):
     return lpf(waveform)
 
 def augment_audio(mel_spec):
-    """Apply random augmentations to mel-spectrogram"""
+    """Apply random augmentations to mel-spectrogram (in place; works on a whole batch)"""
     if random.random() < 0.5:
         # Add noise in frequency domain
-        noise = torch.randn_like(mel_spec) * 0.1
-        mel_spec = mel_spec + noise
+        mel_spec.add_(torch.randn_like(mel_spec), alpha=0.1)
 
     if random.random() < 0.5:
         # Time masking
-        mask = torch.ones_like(mel_spec)
         start = random.randint(0, mel_spec.shape[-1] - 10)
-        mask[:, start:start+10] = 0
-        mel_spec = mel_spec * mask
+        mel_spec[..., start:start+10] = 0
 
     return mel_spec
 
@@ -240,8 +565,9 @@ def augment_video(frames):
         frames = transforms.functional.adjust_contrast(frames, random.uniform(0.8, 1.2))
 
     if random.random() < 0.5:
-        # Frame skip simulation - remove some frames
-        keep_indices = sorted(random.sample(range(frames.shape[1]), k=int(frames.shape[1] * 0.8)))
-        frames = frames[:, keep_indices]
+        # Frame skip simulation - remove some frames (time is dim -3 of [..., C, T, H, W])
+        num_frames = frames.shape[-3]
+        keep_indices = torch.randperm(num_frames, device=frames.device)[:int(num_frames * 0.8)].sort().values
+        frames = frames.index_select(-3, keep_indices)
 
     return frames
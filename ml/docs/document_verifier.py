@@ -1,11 +1,18 @@
 import logging
 import os
+import time
+import hashlib
+from collections import OrderedDict
 import aiohttp
 from typing import Dict, Any, Optional, List
 import json
 
 logger = logging.getLogger(__name__)
 
+# Extracted text per page content hash, so resubmitted documents skip OCR/PDF parsing
+TEXT_CACHE_SIZE = int(os.getenv("DOCUMENT_TEXT_CACHE_SIZE", "1024"))
+TEXT_CACHE_TTL = float(os.getenv("DOCUMENT_TEXT_CACHE_TTL", "1800"))  # seconds
+
 class DocumentVerifier:
     """
     Document verification service that handles the "magic loop" external API calls.
@@ -21,6 +28,10 @@ class DocumentVerifier:
         """
         self.external_api_url = external_api_url or os.getenv("DOCUMENT_VERIFICATION_API_URL", "https://magicloops.dev/api/loop/8cc4fe1a-c325-46ac-ad23-1b469962c2e8/run")
         self.api_key = os.getenv("DOCUMENT_VERIFICATION_API_KEY", "")
+        # Shared keep-alive session, created lazily inside the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        # LRU of (kind, content hash) -> (timestamp, extracted text)
+        self._text_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
         logger.info(f"DocumentVerifier initialized with API URL: {self.external_api_url}")
 
     async def verify_document(self, input_data: Dict[str, Any], compact: bool = False) -> Dict[str, Any]:
@@ -42,7 +53,7 @@ class DocumentVerifier:
             Dictionary containing verification results
         """
         try:
-            logger.info(f"Starting document verification for input type: {input_data.get('INPUT_TYPE')}")
+            logger.info("Starting document verification for input type: %s", input_data.get('INPUT_TYPE'))
 
             # Extract text from document using OCR
             extracted_text = await self._extract_text_from_document(input_data)
@@ -82,24 +93,47 @@ class DocumentVerifier:
                     # Extract text from PDF
                     pdf_bytes = page.get("pdf_bytes", "")
                     if pdf_bytes:
-                        text = await self._extract_text_from_pdf(pdf_bytes)
+                        text = await self._cached_extract("pdf", pdf_bytes, self._extract_text_from_pdf)
                         extracted_texts.append(text)
                 else:
                     # Extract text from image using OCR
                     image_bytes = page.get("image_bytes", "")
                     if image_bytes:
-                        text = await self._extract_text_from_image(image_bytes)
+                        text = await self._cached_extract("image", image_bytes, self._extract_text_from_image)
                         extracted_texts.append(text)
 
             # Combine all extracted text
             full_text = "\n".join(extracted_texts)
-            logger.info(f"Extracted {len(full_text)} characters of text")
+            logger.info("Extracted %d characters of text", len(full_text))
             return full_text
 
         except Exception as e:
             logger.error(f"Text extraction failed: {e}")
             return ""
 
+    async def _cached_extract(self, kind: str, content: str, extract) -> str:
+        """
+        Run `extract(content)` unless the same page content was extracted within
+        TEXT_CACHE_TTL; keyed by a short content digest, not the page itself.
+        """
+        if TEXT_CACHE_SIZE <= 0:
+            return await extract(content)
+
+        key = (kind, hashlib.blake2b(content.encode(), digest_size=16).hexdigest())
+        cached = self._text_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < TEXT_CACHE_TTL:
+            self._text_cache.move_to_end(key)
+            logger.debug("Text extraction cache hit for %s page", kind)
+            return cached[1]
+
+        text = await extract(content)
+        if text:  # failed extractions return "" and are retried next time
+            self._text_cache[key] = (time.monotonic(), text)
+            self._text_cache.move_to_end(key)
+            while len(self._text_cache) > TEXT_CACHE_SIZE:
+                self._text_cache.popitem(last=False)
+        return text
+
     async def _extract_text_from_pdf(self, pdf_bytes: str) -> str:
         """
         Extract text from PDF bytes.
@@ -144,33 +178,50 @@ class DocumentVerifier:
             "PARSING_HINTS": input_data.get("PARSING_HINTS", {})
         }
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, so repeated calls reuse pooled
+        connections instead of a new TCP + TLS handshake each time.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=300)  # 5 minute timeout
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session (call on shutdown)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def _call_external_verification_api(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Call the external document verification API (magic loop).
         """
         try:
-            logger.info(f"Calling external verification API: {self.external_api_url}")
+            logger.info("Calling external verification API: %s", self.external_api_url)
 
             headers = {"Content-Type": "application/json"}
             if self.api_key:
                 headers["Authorization"] = f"Bearer {self.api_key}"
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.external_api_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=300)  # 5 minute timeout
-                ) as response:
-
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.info("External API call successful")
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"External API call failed: {response.status} - {error_text}")
-                        raise Exception(f"External API error: {response.status}")
+            session = await self._get_session()
+            async with session.post(
+                self.external_api_url,
+                json=payload,
+                headers=headers
+            ) as response:
+
+                if response.status == 200:
+                    result = await response.json()
+                    logger.info("External API call successful")
+                    return result
+                else:
+                    error_text = await response.text()
+                    logger.error("External API call failed: %s - %s", response.status, error_text)
+                    raise Exception(f"External API error: {response.status}")
 
         except Exception as e:
             logger.error(f"External API call failed: {e}")
@@ -11,18 +11,22 @@ _os.environ.setdefault("NUMEXPR_NUM_THREADS", "1")
 # -----------------------------------------------------------------------------
 import os
 import io
+import math
 import time
 import base64
 import logging
+import shutil
 import tempfile
 import mimetypes
+import re
 import asyncio
 from typing import Optional, List, Dict
 
+import anyio
 import joblib
 import aiohttp
 from fastapi import FastAPI, HTTPException, Request, Form, UploadFile, File
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
@@ -51,14 +55,15 @@ except Exception:
 # -------- Local imports ----------
 from utils.preprocess import preprocess_document, preprocess_image
 from utils.image_preprocess import preprocess_image_for_model
-from utils.postprocess import postprocess_verification_result
+from utils.postprocess import postprocess_predictions, postprocess_verification_result
 from utils.aws_utils import download_file as s3_download_file
+from utils.batching import MicroBatcher
+from apps.docs_svc import document as document_service
 from apps.docs_svc.document import (
     process_document_verification, VerifyRequest, PageData, DocMeta,
     ExternalReferences, ParsingHints
 )
-from core.inference import load_model
-from docs.document_verifier import DocumentVerifier
+from core.inference import warmup_model, is_model_loaded, InferenceBatcher
 
 # =====================================================
 # Config & Logging
@@ -85,15 +90,49 @@ logger = logging.getLogger(__name__)
 UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "200"))
 MAX_BYTES = UPLOAD_MAX_MB * 1024 * 1024
 UPLOAD_CHUNK = 1024 * 1024  # 1MB
+# Where deepfake audio uploads are spooled for the detector; tmpfs (/dev/shm) keeps them off disk.
+# Videos always go to the default temp dir: Docker's /dev/shm is only 64 MB by default.
+DF_TMPDIR = os.getenv("DF_TMPDIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
 
 # HTTP download client settings
 HTTP_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10, sock_read=50)
 HTTP_CONN_LIMIT = int(os.getenv("HTTP_CONN_LIMIT", "20"))
 
+# Image model warmup at startup (set PRELOAD_WARMUP=0 to load lazily)
+PRELOAD_WARMUP = os.getenv("PRELOAD_WARMUP", "1") == "1"
+WARMUP_IMAGE_SIZE = int(os.getenv("WARMUP_IMAGE_SIZE", "224"))
+
+# Image inference micro-batching (/process)
+IMAGE_BATCH_MAX_SIZE = int(os.getenv("IMAGE_BATCH_MAX_SIZE", "32"))
+IMAGE_BATCH_TIMEOUT_MS = float(os.getenv("IMAGE_BATCH_TIMEOUT_MS", "5"))
+
+# int8 dynamic quantization of the spam transformer's Linear layers when serving on CPU
+SPAM_MODEL_QUANTIZE = os.getenv("SPAM_MODEL_QUANTIZE", "1") == "1"
+
+# TF-IDF + logistic-regression pre-filter: answers /detect_spam without the transformer
+# when its spam probability is outside [SPAM_PREFILTER_LOW, SPAM_PREFILTER_HIGH]
+SPAM_PREFILTER = os.getenv("SPAM_PREFILTER", "1") == "1"
+SPAM_PREFILTER_LOW = float(os.getenv("SPAM_PREFILTER_LOW", "0.05"))
+SPAM_PREFILTER_HIGH = float(os.getenv("SPAM_PREFILTER_HIGH", "0.95"))
+
+# Spam classifier micro-batching (/detect_spam); padded lengths round up to SPAM_PAD_MULTIPLE tokens
+SPAM_BATCH_MAX_SIZE = int(os.getenv("SPAM_BATCH_MAX_SIZE", "32"))
+SPAM_BATCH_TIMEOUT_MS = float(os.getenv("SPAM_BATCH_TIMEOUT_MS", "10"))
+SPAM_PAD_MULTIPLE = int(os.getenv("SPAM_PAD_MULTIPLE", "32"))
+
+# Files of one /process_batch request verified concurrently
+BATCH_FILE_CONCURRENCY = int(os.getenv("BATCH_FILE_CONCURRENCY", "8"))
+
 # Deepfake concurrency (limit heavy jobs)
 DF_MAX_CONCURRENCY = int(os.getenv("DF_MAX_CONCURRENCY", "2"))
 DF_SEM = asyncio.Semaphore(DF_MAX_CONCURRENCY)
 
+# Worker threads for blocking preprocess/postprocess offloaded from the event loop
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", str(max(8, (os.cpu_count() or 1) * 2))))
+
+# Intra-op threads per torch forward; small passes thrash when each one grabs every core
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "2"))
+
 # =====================================================
 # FastAPI app
 # =====================================================
@@ -120,30 +159,23 @@ app.add_middleware(GZipMiddleware, minimum_size=1024)  # compress payloads
 def _to_b64(b: bytes) -> str:
     return base64.b64encode(b).decode("utf-8")
 
+# Image magic numbers (all at offset 0), matched in one compiled regex
+_IMAGE_MAGIC_RE = re.compile(rb"^(?:\xff\xd8\xff|\x89PNG\r\n\x1a\n|GIF8[79]a|RIFF|BM)")
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp", ".gif"})
+
 def _is_pdf(file_bytes: bytes, content_type: Optional[str] = None, filename: Optional[str] = None) -> bool:
     if content_type and "pdf" in content_type.lower():
         return True
     if filename and filename.lower().endswith(".pdf"):
         return True
-    return file_bytes.startswith(b"%PDF-") if len(file_bytes) >= 4 else False
+    return file_bytes[:5] == b"%PDF-"
 
 def _is_image(file_bytes: bytes, content_type: Optional[str] = None, filename: Optional[str] = None) -> bool:
     if content_type and content_type.lower().startswith("image/"):
         return True
-    magic_numbers = {
-        b"\xFF\xD8\xFF": "jpg",
-        b"\x89PNG\r\n\x1a\n": "png",
-        b"GIF87a": "gif",
-        b"GIF89a": "gif",
-        b"RIFF": "webp",
-        b"BM": "bmp",
-    }
-    for magic in magic_numbers:
-        if file_bytes.startswith(magic):
-            return True
-    if filename and any(filename.lower().endswith(ext) for ext in [".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp", ".gif"]):
+    if _IMAGE_MAGIC_RE.match(file_bytes):
         return True
-    return False
+    return bool(filename) and os.path.splitext(filename)[1].lower() in _IMAGE_EXTS
 
 # ---- Single aiohttp session (reused) -----------------------------------------
 SESSION: Optional[aiohttp.ClientSession] = None
@@ -212,34 +244,109 @@ spam_model = None
 tokenizer = None
 _device = "cpu"
 
-# Document verifier
-try:
-    verifier = DocumentVerifier()
-    logger.info("Document verifier loaded successfully.")
-except Exception as e:
-    logger.error(f"Failed to load document verifier: {e}")
-    verifier = None
+# Baseline pre-filter (vectorizer, flattened LR weights, LR bias), loaded at startup
+_spam_prefilter = None
+
+def _load_spam_prefilter():
+    """Load the TF-IDF vectorizer and baseline LR once; None if unavailable or disabled."""
+    if not SPAM_PREFILTER or not (os.path.exists(TFIDF_VECTORIZER_PATH) and os.path.exists(BASELINE_LR_PATH)):
+        return None
+    try:
+        vectorizer = joblib.load(TFIDF_VECTORIZER_PATH)
+        lr = joblib.load(BASELINE_LR_PATH)
+        if list(lr.classes_) != [0, 1]:
+            raise ValueError(f"unexpected baseline classes {list(lr.classes_)}")
+        logger.info("Spam TF-IDF pre-filter loaded")
+        return vectorizer, lr.coef_.ravel().astype("float32"), float(lr.intercept_[0])
+    except Exception as e:
+        logger.warning("Spam pre-filter unavailable, every request uses the transformer: %s", e)
+        return None
+
+def _prefilter_spam_probability(text: str) -> float:
+    """Baseline spam probability: one sparse (1 x V) . (V,) dot product and a sigmoid."""
+    vectorizer, weights, bias = _spam_prefilter
+    score = float(vectorizer.transform([text]).dot(weights)[0]) + bias
+    return 1.0 / (1.0 + math.exp(-score))
+
+def _quantize_spam_model(model):
+    """int8 dynamic quantization of the model's nn.Linear layers; keeps fp32 if unsupported."""
+    try:
+        if "fbgemm" in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = "fbgemm"
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info("Spam model linear layers quantized to int8 (%s)", torch.backends.quantized.engine)
+        return quantized
+    except Exception as e:
+        logger.warning("Spam model quantization failed, using fp32: %s", e)
+        return model
+
+def _spam_forward(texts: List[str]) -> List[tuple]:
+    """One padded forward pass over `texts`; returns (pred, spam probability) per text."""
+    # Length bucketing keeps the set of input shapes small and padding waste bounded
+    enc = tokenizer(
+        texts,
+        return_tensors="pt",
+        truncation=True,
+        padding=True,
+        max_length=256,
+        pad_to_multiple_of=SPAM_PAD_MULTIPLE
+    )
+    enc = {k: v.to(_device) for k, v in enc.items()}
+
+    with torch.inference_mode():
+        amp_ctx = torch.cuda.amp.autocast() if _device == "cuda" else _NullCtx()
+        with amp_ctx:
+            probs = spam_model(**enc).logits.float().softmax(dim=-1)
+    preds = probs.argmax(dim=-1).tolist()
+    spam_probs = probs[:, 1].tolist()
+    return list(zip(preds, spam_probs))
+
+image_batcher = InferenceBatcher(max_batch_size=IMAGE_BATCH_MAX_SIZE, timeout_ms=IMAGE_BATCH_TIMEOUT_MS)
+# `await spam_batcher.submit(text)` resolves to (pred, probability); concurrent requests share a forward pass
+spam_batcher = MicroBatcher(_spam_forward, max_batch_size=SPAM_BATCH_MAX_SIZE,
+                            timeout_ms=SPAM_BATCH_TIMEOUT_MS, name="spam detection")
+
+@app.on_event("startup")
+async def _verifier_start():
+    # One DocumentVerifier per worker, owned by apps.docs_svc.document: that is the
+    # instance process_document_verification reads (its app's lifespan never runs here)
+    document_service.load_verifier()
 
 @app.on_event("startup")
 async def startup_warmup_models():
-    global spam_model, tokenizer, _device
+    global spam_model, tokenizer, _device, _spam_prefilter
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     _device = "cuda" if TORCH_AVAILABLE and torch.cuda.is_available() else "cpu"
     if TORCH_AVAILABLE:
         try:
-            torch.set_num_threads(max(1, os.cpu_count() // 2))
+            torch.set_num_threads(max(1, TORCH_NUM_THREADS))
             torch.set_num_interop_threads(1)
         except Exception:
             pass
 
+    _spam_prefilter = _load_spam_prefilter()
+
     if TRANSFORMERS_AVAILABLE:
         try:
-            spam_model = AutoModelForSequenceClassification.from_pretrained(TRANSFORMER_MODEL_DIR)
+            # Fused scaled_dot_product_attention kernels where the architecture supports them
             try:
-                tokenizer = AutoTokenizer.from_pretrained(TRANSFORMER_MODEL_DIR)
+                spam_model = AutoModelForSequenceClassification.from_pretrained(
+                    TRANSFORMER_MODEL_DIR, attn_implementation="sdpa"
+                )
+            except (TypeError, ValueError, ImportError) as e:
+                logger.warning("SDPA attention unavailable for spam model, using eager attention: %s", e)
+                spam_model = AutoModelForSequenceClassification.from_pretrained(TRANSFORMER_MODEL_DIR)
+            # Rust ("fast") tokenizer: a checkpoint without tokenizer.json is converted once here
+            try:
+                tokenizer = AutoTokenizer.from_pretrained(TRANSFORMER_MODEL_DIR, use_fast=True)
             except Exception as e:
                 logger.warning(f"Tokenizer missing in checkpoint, falling back: {e}")
-                tokenizer = AutoTokenizer.from_pretrained("distilroberta-base")
+                tokenizer = AutoTokenizer.from_pretrained("distilroberta-base", use_fast=True)
+            if not getattr(tokenizer, "is_fast", False):
+                logger.warning("Spam tokenizer has no fast (Rust) implementation; tokenization will be slow")
             spam_model.to(_device).eval()
+            if TORCH_AVAILABLE and _device == "cpu" and SPAM_MODEL_QUANTIZE:
+                spam_model = _quantize_spam_model(spam_model)
             # NOTE: omit torch.compile() for faster warmup on CPU/Windows
             # Warmup forward
             if TORCH_AVAILABLE:
@@ -255,6 +362,27 @@ async def startup_warmup_models():
     else:
         logger.error("Transformers not available")
 
+    if TORCH_AVAILABLE and PRELOAD_WARMUP:
+        try:
+            warmup_model((1, 3, WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE))
+        except Exception as e:
+            logger.error("Failed to warm up image model: %s", e)
+
+    if TORCH_AVAILABLE:
+        image_batcher.start()
+        if spam_model is not None:
+            spam_batcher.start()
+
+@app.on_event("shutdown")
+async def _image_batcher_stop():
+    await image_batcher.stop()
+    await spam_batcher.stop()
+
+@app.on_event("shutdown")
+async def _verifier_stop():
+    # DocumentVerifier owns a keep-alive aiohttp session
+    await document_service.close_verifier()
+
 
 # =====================================================
 # Health & readiness
@@ -266,11 +394,11 @@ async def health():
 @app.get("/ready")
 async def readiness():
     try:
-        load_model()  # image model warm-check
+        # Probes only report state; loading the image model is left to startup warmup / first request
         status = {
-            "image_model": "loaded",
+            "image_model": "loaded" if is_model_loaded() else "not_loaded",
             "spam_model": "loaded" if (spam_model and tokenizer) else "not_loaded",
-            "document_verifier": "loaded" if verifier is not None else "not_loaded",
+            "document_verifier": "loaded" if document_service.verifier is not None else "not_loaded",
             "deepfake_detection": "loaded" if deepfake_available else "not_loaded"
         }
         all_loaded = all(v == "loaded" for v in status.values())
@@ -278,6 +406,30 @@ async def readiness():
     except Exception as e:
         return {"status": "partial", "error": str(e)}
 
+# =====================================================
+# Image classification (micro-batched)
+# =====================================================
+@app.post("/process")
+async def process_image(request: ProcessRequest):
+    if not TORCH_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Image model not available")
+    t0 = time.time()
+    image_bytes = await http_download_file(request.image_url)
+
+    preprocessed_image = await anyio.to_thread.run_sync(preprocess_image_for_model, image_bytes)
+    if preprocessed_image is None:
+        raise HTTPException(status_code=400, detail="Failed to preprocess image")
+
+    try:
+        raw_predictions = await image_batcher.submit(preprocessed_image)
+    except Exception as e:
+        logger.error("Image inference failed: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Image inference failed")
+
+    result = await anyio.to_thread.run_sync(postprocess_predictions, raw_predictions)
+    result["latency_ms"] = round((time.time() - t0) * 1000, 1)
+    return result
+
 # =====================================================
 # Document processing
 # =====================================================
@@ -299,13 +451,14 @@ async def process_document_endpoint(
     if not is_pdf and not is_image:
         raise HTTPException(status_code=400, detail="Unsupported file type. Only PDF and image files are supported.")
 
+    # OCR preprocessing is CPU-bound; keep it off the event loop
     if is_pdf:
-        preprocessed_data = preprocess_document(
-            file_bytes=file_bytes, filename=filename, doc_title=doc_title or "Untitled Document", doc_issuer=doc_issuer
+        preprocessed_data = await anyio.to_thread.run_sync(
+            preprocess_document, file_bytes, filename, doc_title or "Untitled Document", doc_issuer
         )
     else:
-        preprocessed_data = preprocess_image(
-            image_bytes=file_bytes, filename=filename, doc_title=doc_title or "Untitled Document", doc_issuer=doc_issuer
+        preprocessed_data = await anyio.to_thread.run_sync(
+            preprocess_image, file_bytes, filename, doc_title or "Untitled Document", doc_issuer
         )
 
     verify_request = VerifyRequest(
@@ -331,29 +484,36 @@ async def process_document_endpoint(
     final_result["latency_ms"] = round((time.time() - t0) * 1000, 1)
     return final_result
 
-@app.post("/process_batch")
-async def process_batch_endpoint(
-    files: List[UploadFile] = File(...),
-    compact: bool = Form(True),
-):
-    results = []
-    for file in files:
+async def _process_batch_file(file: UploadFile, compact: bool, sem: asyncio.Semaphore) -> dict:
+    async with sem:
         try:
             file_bytes = await file.read()
             if len(file_bytes) > MAX_BYTES:
                 raise HTTPException(status_code=400, detail=f"{file.filename} too large (>{UPLOAD_MAX_MB} MB limit)")
-            verify_request = _build_verify_request_from_upload(
-                file_bytes=file_bytes,
-                filename=file.filename,
-                content_type=file.content_type,
-                doc_meta={"title": file.filename},
-                parsing_hints={}
+            # base64 encoding of the upload is CPU-bound; keep it off the event loop
+            verify_request = await anyio.to_thread.run_sync(
+                lambda: _build_verify_request_from_upload(
+                    file_bytes=file_bytes,
+                    filename=file.filename,
+                    content_type=file.content_type,
+                    doc_meta={"title": file.filename},
+                    parsing_hints={}
+                )
             )
             resp = await process_document_verification(verify_request, compact=compact)
             payload = resp.model_dump() if hasattr(resp, "model_dump") else resp.dict() if hasattr(resp, "dict") else resp
-            results.append({"filename": file.filename, "success": True, "result": payload})
+            return {"filename": file.filename, "success": True, "result": payload}
         except Exception as e:
-            results.append({"filename": file.filename, "success": False, "error": str(e)})
+            return {"filename": file.filename, "success": False, "error": str(e)}
+
+@app.post("/process_batch")
+async def process_batch_endpoint(
+    files: List[UploadFile] = File(...),
+    compact: bool = Form(True),
+):
+    # Files are read, encoded and verified concurrently (bounded); results keep upload order
+    sem = asyncio.Semaphore(max(1, BATCH_FILE_CONCURRENCY))
+    results = await asyncio.gather(*(_process_batch_file(file, compact, sem) for file in files))
     return {
         "processed_count": len(files),
         "successful_count": sum(1 for r in results if r["success"]),
@@ -375,27 +535,20 @@ async def detect_spam(request: SpamRequest):
 
     t0 = time.time()
     try:
-        # Explicitly annotate the tokenizer output so static checkers know the shape/type of `enc`.
-        # We use a string annotation for torch.Tensor to avoid runtime import issues if torch is not available.
-        enc: Dict[str, "torch.Tensor"] = tokenizer(
-            request.text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=256
-        )
-        if TORCH_AVAILABLE:
-            # Iterate over a concrete list of keys to avoid runtime mutation surprises
-            for k in list(enc.keys()):
-                enc[k] = enc[k].to(_device)
-
-        with (torch.inference_mode() if TORCH_AVAILABLE else _NullCtx()):
-            amp_ctx = torch.cuda.amp.autocast() if (TORCH_AVAILABLE and _device == "cuda") else _NullCtx()
-            with amp_ctx:
-                out = spam_model(**enc)
-                probs = out.logits.softmax(dim=-1) if TORCH_AVAILABLE else out.logits.softmax(-1)
-                pred = int(probs.argmax(dim=-1).item())
-                probability = float(probs[0][1].item())
+        # Clear-cut texts are answered by the TF-IDF baseline without a transformer pass
+        if _spam_prefilter is not None:
+            probability = _prefilter_spam_probability(request.text)
+            if probability < SPAM_PREFILTER_LOW or probability > SPAM_PREFILTER_HIGH:
+                return {
+                    "reference_id": request.reference_id,
+                    "is_spam": probability > SPAM_PREFILTER_HIGH,
+                    "probability": probability,
+                    "latency_ms": round((time.time() - t0) * 1000, 1),
+                    "model": os.path.basename(BASELINE_LR_PATH)
+                }
+
+        # Coalesced with concurrent requests into one padded forward pass
+        pred, probability = await spam_batcher.submit(request.text)
 
         latency_ms = (time.time() - t0) * 1000
         return {
@@ -417,26 +570,17 @@ class DownloadS3Request(BaseModel):
 
 @app.post("/download_s3")
 async def download_s3(request: DownloadS3Request):
-    file_bytes = s3_download_file(request.key_or_url)
+    # boto3/requests are blocking; download in a worker thread so the event loop keeps serving
+    file_bytes = await anyio.to_thread.run_sync(s3_download_file, request.key_or_url)
     if not file_bytes:
         raise HTTPException(status_code=404, detail="File not found or could not be downloaded")
 
     filename = os.path.basename(request.key_or_url)
-    ext = filename.lower()
-    if ext.endswith(".pdf"):
-        media_type = "application/pdf"
-    elif ext.endswith((".jpg", ".jpeg")):
-        media_type = "image/jpeg"
-    elif ext.endswith(".png"):
-        media_type = "image/png"
-    elif ext.endswith((".mp3", ".wav")):
-        media_type = "audio/mpeg"
-    elif ext.endswith((".mp4", ".mov", ".avi")):
-        media_type = "video/mp4"
-    else:
-        media_type = "application/octet-stream"
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
 
-    return StreamingResponse(io.BytesIO(file_bytes), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+    # Bytes are already in memory: send them as one body (with Content-Length) rather than
+    # streaming a BytesIO, which iterates line by line
+    return Response(content=file_bytes, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
 # =====================================================
 # Deepfake Detection  (offloaded to threadpool)
@@ -466,7 +610,38 @@ def _safe_ext_from_name(name: str, allowed: set[str], default_ext: str) -> str:
     ext = ext.lower()
     return ext if ext in allowed else default_ext
 
-import anyio
+def _audio_spool_dir() -> Optional[str]:
+    """DF_TMPDIR when it has room for a maximum-size upload, else None (default temp dir)."""
+    if DF_TMPDIR:
+        try:
+            if shutil.disk_usage(DF_TMPDIR).free >= MAX_BYTES:
+                return DF_TMPDIR
+        except OSError:
+            pass
+    return None
+
+def _spool_upload(src, suffix: str, tmpdir: Optional[str] = None) -> str:
+    """
+    Copy an upload's file object to a named temp file in ``tmpdir`` UPLOAD_CHUNK bytes
+    at a time, enforcing the size limit as it goes; returns the temp path. Blocking:
+    run in a thread.
+    """
+    total = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=tmpdir) as tmp:
+        try:
+            while True:
+                chunk = src.read(UPLOAD_CHUNK)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > MAX_BYTES:
+                    raise HTTPException(status_code=400, detail=f"File too large (>{UPLOAD_MAX_MB} MB limit)")
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name
 
 @router.post("/detect_deepfake_audio", response_model=DeepfakeResponse)
 async def detect_deepfake_audio(
@@ -478,17 +653,12 @@ async def detect_deepfake_audio(
     if not file.filename:
         raise HTTPException(status_code=400, detail="File must have a filename")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"File too large (>{UPLOAD_MAX_MB} MB limit)")
-
     tmp_path = None
     t0 = time.time()
     try:
         ext = _safe_ext_from_name(file.filename, ALLOWED_AUDIO_EXTS, ".wav")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
+        # Streamed to tmpfs (when it has room) in chunks; the upload is never held in memory as one bytes object
+        tmp_path = await anyio.to_thread.run_sync(_spool_upload, file.file, ext, _audio_spool_dir())
 
         # Offload heavy detector to a worker thread and gate with semaphore
         async with DF_SEM:
@@ -520,18 +690,13 @@ async def detect_deepfake_video(
     if not file.filename:
         raise HTTPException(status_code=400, detail="File must have a filename")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"File too large (>{UPLOAD_MAX_MB} MB limit)")
-
     tmp_path = None
     t0 = time.time()
     try:
         _, ext = os.path.splitext(file.filename)
         ext = ext.lower() if ext.lower() in ALLOWED_VIDEO_EXTS else ".mp4"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
+        # Streamed to disk in chunks; the upload is never held in memory as one bytes object
+        tmp_path = await anyio.to_thread.run_sync(_spool_upload, file.file, ext)
 
         async with DF_SEM:
             start = time.time()
@@ -6,10 +6,12 @@ Outputs text_manifest.csv with columns: text, label, source, split
 """
 
 import os
+import numpy as np
 import pandas as pd
 import requests
 import zipfile
 import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.model_selection import train_test_split
 import logging
 
@@ -21,13 +23,48 @@ MANIFEST_PATH = "data/text_manifest.csv"
 
 os.makedirs(DATA_DIR, exist_ok=True)
 
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+DOWNLOAD_CONNECTIONS = int(os.getenv("DOWNLOAD_CONNECTIONS", "8"))
+MIN_RANGED_DOWNLOAD = 16 << 20  # smaller files are not worth splitting
+
+def _download_range(url, dest_path, start, end):
+    """Fetch bytes [start, end] of `url` into the same offsets of a preallocated file."""
+    headers = {'Range': f'bytes={start}-{end}'}
+    with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise IOError(f"Server ignored range request for {url}")
+        with open(dest_path, 'r+b') as f:
+            f.seek(start)
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+
 def download_file(url, dest_path):
-    """Download file from URL."""
+    """
+    Download file from URL straight to disk in 1 MB chunks; large files on servers
+    that accept byte ranges are fetched over DOWNLOAD_CONNECTIONS parallel ranges.
+    """
     logger.info(f"Downloading {url} to {dest_path}")
-    response = requests.get(url)
-    response.raise_for_status()
-    with open(dest_path, 'wb') as f:
-        f.write(response.content)
+    head = requests.head(url, allow_redirects=True, timeout=60)
+    total = int(head.headers.get('Content-Length', 0))
+    if (DOWNLOAD_CONNECTIONS > 1 and total >= MIN_RANGED_DOWNLOAD
+            and head.headers.get('Accept-Ranges') == 'bytes'):
+        with open(dest_path, 'wb') as f:
+            f.truncate(total)
+        bounds = [i * total // DOWNLOAD_CONNECTIONS for i in range(DOWNLOAD_CONNECTIONS + 1)]
+        try:
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_CONNECTIONS) as executor:
+                list(executor.map(lambda i: _download_range(head.url, dest_path, bounds[i], bounds[i + 1] - 1),
+                                  range(DOWNLOAD_CONNECTIONS)))
+            return
+        except Exception as e:
+            logger.warning(f"Ranged download failed, retrying with a single connection: {e}")
+
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(dest_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
 
 def extract_zip(zip_path, extract_to):
     """Extract ZIP file."""
@@ -35,10 +72,21 @@ def extract_zip(zip_path, extract_to):
         zip_ref.extractall(extract_to)
 
 def extract_tar(tar_path, extract_to):
-    """Extract TAR file."""
-    with tarfile.open(tar_path, 'r:gz') as tar_ref:
+    """Extract TAR file as a sequential stream (no member index, no seeking)."""
+    with tarfile.open(tar_path, 'r|gz') as tar_ref:
         tar_ref.extractall(extract_to)
 
+def download_and_extract(url, archive_path, extract_to):
+    """Download an archive, extract it, and drop the archive so disk use is not doubled."""
+    download_file(url, archive_path)
+    try:
+        if archive_path.endswith('.zip'):
+            extract_zip(archive_path, extract_to)
+        else:
+            extract_tar(archive_path, extract_to)
+    finally:
+        os.remove(archive_path)
+
 def load_sms_spam():
     """Load SMS Spam Collection dataset."""
     url = "https://archive.ics.uci.edu/ml/machine-learning-databases/00228/smsspamcollection.zip"
@@ -46,8 +94,7 @@ def load_sms_spam():
     extract_to = os.path.join(DATA_DIR, "smsspam")
 
     if not os.path.exists(extract_to):
-        download_file(url, zip_path)
-        extract_zip(zip_path, extract_to)
+        download_and_extract(url, zip_path, extract_to)
 
     # Load the data
     file_path = os.path.join(extract_to, "SMSSpamCollection")
@@ -117,15 +164,15 @@ def main():
     # Normalize text (basic)
     df['text'] = df['text'].str.lower().str.strip()
 
-    # Stratified split
-    train_df, temp_df = train_test_split(df, test_size=0.2, stratify=df['label'], random_state=42)
-    val_df, test_df = train_test_split(temp_df, test_size=0.5, stratify=temp_df['label'], random_state=42)
-
-    train_df['split'] = 'train'
-    val_df['split'] = 'val'
-    test_df['split'] = 'test'
+    # Stratified split over row positions; rows are gathered and labelled in one pass
+    labels = df['label'].to_numpy()
+    positions = np.arange(len(df))
+    train_idx, temp_idx = train_test_split(positions, test_size=0.2, stratify=labels, random_state=42)
+    val_idx, test_idx = train_test_split(temp_idx, test_size=0.5, stratify=labels[temp_idx], random_state=42)
 
-    final_df = pd.concat([train_df, val_df, test_df])
+    order = np.concatenate([train_idx, val_idx, test_idx])
+    splits = np.repeat(['train', 'val', 'test'], [len(train_idx), len(val_idx), len(test_idx)])
+    final_df = df.iloc[order].assign(split=splits)
 
     # Save manifest
     final_df.to_csv(MANIFEST_PATH, index=False)
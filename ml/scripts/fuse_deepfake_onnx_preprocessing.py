@@ -0,0 +1,74 @@
+"""
+Script to fuse the deepfake face classifier's input preprocessing into its ONNX graph.
+
+Prepends Cast(uint8 -> float) -> Mul(1/255) -> Transpose(NHWC -> NCHW) to the
+model input, so DeepfakeDetector binds the RGB HWC uint8 face crops as they come
+out of the frame scan (no per-face transpose or float math in Python, a quarter
+of the bytes per batch), and writes <model>.nhwc.onnx next to the model. Point
+DEEPFAKE_ONNX at the new file to use it; run quantize_deepfake_onnx.py on it
+afterwards for an INT8 variant.
+
+Usage: python scripts/fuse_deepfake_onnx_preprocessing.py <model.onnx>
+"""
+
+import os
+import sys
+import logging
+
+import onnx
+from onnx import TensorProto, helper
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PIXELS_INPUT = "pixels"
+
+def _dim(d):
+    """ONNX shape dim as an int, a symbolic name, or None if unknown."""
+    if d.dim_param:
+        return d.dim_param
+    return d.dim_value or None
+
+def fuse_preprocessing(model_path):
+    """Prepend uint8 NHWC preprocessing to `model_path`'s NCHW float input."""
+    model = onnx.load(model_path)
+    graph = model.graph
+    initializer_names = {init.name for init in graph.initializer}
+    old_input = next(i for i in graph.input if i.name not in initializer_names)
+    tensor_type = old_input.type.tensor_type
+    if len(tensor_type.shape.dim) != 4:
+        raise ValueError(f"Expected a 4-D NCHW input, got {old_input.name} with {len(tensor_type.shape.dim)} dims")
+    if tensor_type.elem_type not in (TensorProto.FLOAT, TensorProto.FLOAT16):
+        raise ValueError(f"Expected a float input, got {old_input.name} of type {tensor_type.elem_type}")
+
+    n, c, h, w = (_dim(d) for d in tensor_type.shape.dim)
+    new_input = helper.make_tensor_value_info(PIXELS_INPUT, TensorProto.UINT8, [n, h, w, c])
+
+    elem_type = tensor_type.elem_type
+    graph.initializer.append(helper.make_tensor("preprocess/scale", elem_type, [], [1.0 / 255.0]))
+    nodes = [
+        helper.make_node("Cast", [PIXELS_INPUT], ["preprocess/float"], to=elem_type, name="preprocess/cast"),
+        helper.make_node("Mul", ["preprocess/float", "preprocess/scale"], ["preprocess/scaled"],
+                         name="preprocess/scale"),
+        helper.make_node("Transpose", ["preprocess/scaled"], [old_input.name], perm=[0, 3, 1, 2],
+                         name="preprocess/nchw"),
+    ]
+    for i, node in enumerate(nodes):
+        graph.node.insert(i, node)
+    graph.input.remove(old_input)
+    graph.input.insert(0, new_input)
+    onnx.checker.check_model(model)
+
+    fused_path = os.path.splitext(model_path)[0] + ".nhwc.onnx"
+    onnx.save(model, fused_path)
+    logger.info(f"Model with fused uint8 NHWC preprocessing written to {fused_path}")
+    return fused_path
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    fuse_preprocessing(sys.argv[1])
+
+if __name__ == "__main__":
+    main()
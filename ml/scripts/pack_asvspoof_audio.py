@@ -0,0 +1,90 @@
+"""
+Script to pack ASVspoof 2019 audio into contiguous fixed-length waveform arrays.
+
+Decodes every clip once (16 kHz mono, padded/cropped like RawAudioDataset), splits
+train/val exactly as get_data_loaders does, shuffles each split once, and writes
+<out_dir>/<split>/waveforms.npy (float32 [N, T]) and labels.npy. Because rows are
+pre-shuffled, PackedAudioDataset can serve every batch as one contiguous slice
+of a memory-mapped file instead of opening one audio file per item.
+
+With --mels it also precomputes the normalized log-mel features once
+(AudioBatchTransform, on GPU when available) into float16 mels.npy
+[N, 128, frames]; PackedAudioDataset then serves those and training skips the
+STFT entirely.
+
+Usage: python scripts/pack_asvspoof_audio.py <data_dir> <out_dir> [--mels]
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+import torch
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_preprocessing import load_asvspoof2019, RawAudioDataset, AudioBatchTransform  # noqa: E402
+
+MEL_BATCH_SIZE = 256
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def pack_split(paths, labels, out_dir, seed=42):
+    """Write one split's shuffled waveforms and labels as .npy arrays."""
+    os.makedirs(out_dir, exist_ok=True)
+    order = np.random.default_rng(seed).permutation(len(paths))
+    dataset = RawAudioDataset([paths[i] for i in order], [labels[i] for i in order])
+
+    waves = np.lib.format.open_memmap(
+        os.path.join(out_dir, "waveforms.npy"), mode="w+", dtype=np.float32,
+        shape=(len(dataset), dataset.num_samples)
+    )
+    for i in range(len(dataset)):
+        waves[i] = dataset[i]["waveform"].numpy()
+        if (i + 1) % 10000 == 0:
+            logger.info(f"Packed {i + 1}/{len(dataset)} clips into {out_dir}")
+    waves.flush()
+    np.save(os.path.join(out_dir, "labels.npy"), np.asarray(dataset.labels, dtype=np.float32))
+    logger.info(f"Packed {len(dataset)} clips into {out_dir}")
+
+def write_mels(split_dir):
+    """Featurize a packed split's waveforms in batches into float16 mels.npy."""
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    transform = AudioBatchTransform().to(device)
+    waves = np.load(os.path.join(split_dir, "waveforms.npy"), mmap_mode="r")
+
+    with torch.inference_mode():
+        n_mels, n_frames = transform(torch.zeros(1, waves.shape[1], device=device)).shape[1:]
+        mels = np.lib.format.open_memmap(
+            os.path.join(split_dir, "mels.npy"), mode="w+", dtype=np.float16,
+            shape=(len(waves), n_mels, n_frames)
+        )
+        for start in range(0, len(waves), MEL_BATCH_SIZE):
+            batch = torch.from_numpy(np.array(waves[start:start + MEL_BATCH_SIZE])).to(device)
+            mels[start:start + len(batch)] = transform(batch).half().cpu().numpy()
+    mels.flush()
+    logger.info(f"Wrote log-mel features for {len(waves)} clips to {split_dir}")
+
+def main():
+    args = [a for a in sys.argv[1:] if a != "--mels"]
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(1)
+    data_dir, out_dir = args
+
+    paths, labels = load_asvspoof2019(os.path.join(data_dir, "asv-spoof-2019"))
+    if not paths:
+        raise ValueError(f"No ASVspoof audio found under {data_dir}")
+    train_paths, val_paths, train_labels, val_labels = train_test_split(
+        paths, labels, test_size=0.2, random_state=42
+    )
+    pack_split(train_paths, train_labels, os.path.join(out_dir, "train"))
+    pack_split(val_paths, val_labels, os.path.join(out_dir, "val"))
+    if "--mels" in sys.argv:
+        write_mels(os.path.join(out_dir, "train"))
+        write_mels(os.path.join(out_dir, "val"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Script to decode DFDC videos once into a contiguous uint8 clip array.
+
+Samples and resizes every clip exactly like VideoDataset(raw=True) (16 evenly
+spaced RGB frames at 224x224), splits train/val exactly as get_data_loaders
+does, and writes <out_dir>/<split>/clips.npy (uint8 [N, 3, 16, 224, 224]) and
+labels.npy. PackedVideoDataset then serves each clip as one slice of a
+memory-mapped file, so training epochs never decode video again.
+
+Usage: python scripts/pack_dfdc_video.py <data_dir> <out_dir>
+"""
+
+import os
+import sys
+import logging
+
+import numpy as np
+from torch.utils.data import DataLoader
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_preprocessing import load_dfdc, VideoDataset  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def pack_split(paths, labels, out_dir):
+    """Decode one split's clips (in parallel worker processes) into clips.npy and labels.npy."""
+    os.makedirs(out_dir, exist_ok=True)
+    dataset = VideoDataset(paths, labels, raw=True)
+    clips = np.lib.format.open_memmap(
+        os.path.join(out_dir, "clips.npy"), mode="w+", dtype=np.uint8,
+        shape=(len(dataset), 3, dataset.num_frames, dataset.frame_size, dataset.frame_size)
+    )
+    loader = DataLoader(dataset, batch_size=None, num_workers=os.cpu_count() or 1)
+    for i, item in enumerate(loader):
+        clips[i] = item["pixel_values"].numpy()
+        if (i + 1) % 1000 == 0:
+            logger.info(f"Packed {i + 1}/{len(dataset)} clips into {out_dir}")
+    clips.flush()
+    np.save(os.path.join(out_dir, "labels.npy"), np.asarray(labels, dtype=np.float32))
+    logger.info(f"Packed {len(dataset)} clips into {out_dir}")
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    data_dir, out_dir = sys.argv[1:]
+
+    paths, labels = load_dfdc(os.path.join(data_dir, "dfdc"))
+    if not paths:
+        raise ValueError(f"No DFDC videos found under {data_dir}")
+    train_paths, val_paths, train_labels, val_labels = train_test_split(
+        paths, labels, test_size=0.2, random_state=42
+    )
+    pack_split(train_paths, train_labels, os.path.join(out_dir, "train"))
+    pack_split(val_paths, val_labels, os.path.join(out_dir, "val"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Script to quantize the deepfake face classifier to INT8 for CPU inference.
+
+Runs ONNX Runtime post-training static quantization (per-channel QInt8 weights,
+QUInt8 activations, QDQ format) calibrated on a folder of face crops, and writes
+<model>.quant.onnx next to the FP32 model, which DeepfakeDetector picks up
+automatically on CPU-only hosts.
+
+With --trt it writes <model>.trt.quant.onnx instead, with symmetric QInt8
+activations and weights (zero point 0), the only INT8 QDQ TensorRT accepts;
+DeepfakeDetector picks that file up under the TensorRT execution provider.
+
+Usage: python scripts/quantize_deepfake_onnx.py [--trt] <model.onnx> <calibration_image_dir>
+"""
+
+import os
+import sys
+import logging
+
+import cv2
+import numpy as np
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FACE_SIZE = 224
+MAX_CALIBRATION_IMAGES = 200
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+class FaceCalibrationReader(CalibrationDataReader):
+    """Feeds face crops preprocessed exactly like DeepfakeDetector._analyze_frames_with_model."""
+
+    def __init__(self, image_dir, input_name, raw_pixels=False):
+        self.input_name = input_name
+        self.raw_pixels = raw_pixels  # uint8 NHWC input (fuse_deepfake_onnx_preprocessing.py)
+        self.paths = sorted(
+            os.path.join(image_dir, f) for f in os.listdir(image_dir)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )[:MAX_CALIBRATION_IMAGES]
+        self._iter = iter(self.paths)
+
+    def get_next(self):
+        for path in self._iter:
+            face = cv2.imread(path)
+            if face is None:
+                continue
+            face = cv2.resize(face, (FACE_SIZE, FACE_SIZE))
+            if self.raw_pixels:
+                x = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
+            else:
+                x = face.transpose(2, 0, 1)[::-1].astype(np.float32) / 255.0  # BGR HWC -> RGB CHW
+            return {self.input_name: x[np.newaxis]}
+        return None
+
+def quantize_model(model_path, image_dir, trt=False):
+    """
+    Quantize `model_path` with calibration images from `image_dir`; `trt` writes
+    the symmetric QInt8 variant for TensorRT.
+    """
+    import onnxruntime as ort
+
+    model_input = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"]).get_inputs()[0]
+    reader = FaceCalibrationReader(image_dir, model_input.name, raw_pixels=model_input.type == "tensor(uint8)")
+    if not reader.paths:
+        raise ValueError(f"No calibration images found in {image_dir}")
+
+    quant_path = os.path.splitext(model_path)[0] + (".trt.quant.onnx" if trt else ".quant.onnx")
+    logger.info(f"Quantizing {model_path} with {len(reader.paths)} calibration images")
+    quantize_static(
+        model_path,
+        quant_path,
+        calibration_data_reader=reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QInt8 if trt else QuantType.QUInt8,
+        extra_options={"ActivationSymmetric": True, "WeightSymmetric": True} if trt else None,
+    )
+    logger.info(f"INT8 model written to {quant_path}")
+    return quant_path
+
+def main():
+    args = sys.argv[1:]
+    trt = "--trt" in args
+    if trt:
+        args.remove("--trt")
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(1)
+    quantize_model(args[0], args[1], trt=trt)
+
+if __name__ == "__main__":
+    main()
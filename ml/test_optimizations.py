@@ -0,0 +1,418 @@
+import asyncio
+import io
+import os
+import threading
+import numpy as np
+import pytest
+
+
+# --------------------------------------------------------------------
+# HELPERS
+# --------------------------------------------------------------------
+
+def video_module():
+    """Import the video detector module, skipping when its heavy deps are missing."""
+    for dep in ("cv2", "mediapipe", "librosa", "onnxruntime", "scipy"):
+        pytest.importorskip(dep)
+    from apps.df_svc import video
+    return video
+
+
+def main_module():
+    """Import the main app module, skipping when its heavy deps are missing."""
+    for dep in ("fastapi", "anyio", "joblib", "aiohttp", "torch", "torchvision", "cv2",
+                "pytesseract", "pdf2image", "boto3", "PIL"):
+        pytest.importorskip(dep)
+    return pytest.importorskip("main")
+
+
+@pytest.fixture(scope="module")
+def video_detector():
+    video = video_module()
+    return video.DeepfakeDetector(fast_mode=True)
+
+
+# --------------------------------------------------------------------
+# VIDEO HELPERS (vectorized rewrites vs. the original per-frame loops)
+# --------------------------------------------------------------------
+
+class TestVideoHelpers:
+    """Check the rewritten video helpers against the implementations they replaced."""
+
+    def test_ear_series_matches_per_eye_norms(self, video_detector):
+        """The batched EAR equals the original per-frame, per-eye np.linalg.norm formula."""
+        rng = np.random.default_rng(0)
+        h, w = 480, 640
+        eyes = rng.random((25, 2, 6, 2), dtype=np.float32)
+
+        def old_ear(eye):
+            p = eye * np.array([w, h])
+            vertical1 = np.linalg.norm(p[1] - p[5])
+            vertical2 = np.linalg.norm(p[2] - p[4])
+            horizontal = np.linalg.norm(p[0] - p[3])
+            return (vertical1 + vertical2) / (2.0 * horizontal + 1e-6)
+
+        expected = [(old_ear(frame[0]) + old_ear(frame[1])) / 2.0 for frame in eyes]
+        np.testing.assert_allclose(video_detector._ear_series(eyes, h, w), expected, rtol=1e-4)
+
+    @pytest.mark.parametrize("n", [5, 40, 300])
+    def test_sync_correlation_matches_per_lag_corrcoef(self, video_detector, n):
+        """Prefix-sum lag search gives the same mismatch as np.corrcoef on each overlap."""
+        rng = np.random.default_rng(n)
+        mouth = rng.random(n).tolist()
+        audio = np.roll(np.asarray(mouth), 2) + 0.3 * rng.random(n)
+        audio = np.interp(np.linspace(0, 1, 2 * n), np.linspace(0, 1, n), audio)
+
+        ar = np.interp(np.linspace(0, 1, n), np.linspace(0, 1, len(audio)), audio)
+        ma = np.asarray(mouth)
+        max_corr = -1
+        for lag in range(-3, 4):
+            if lag < 0:
+                corr = np.corrcoef(ar[:lag], ma[-lag:])[0, 1]
+            elif lag > 0:
+                corr = np.corrcoef(ar[lag:], ma[:-lag])[0, 1]
+            else:
+                corr = np.corrcoef(ar, ma)[0, 1]
+            if not np.isnan(corr):
+                max_corr = max(max_corr, corr)
+        expected = max(0.0, 1.0 - (max_corr + 1) / 2.0)
+
+        assert video_detector._compute_sync_correlation(audio, mouth) == pytest.approx(expected, abs=1e-9)
+
+    def test_sync_correlation_flat_series(self, video_detector):
+        """A flat mouth series has no defined correlation and scores as full mismatch."""
+        assert video_detector._compute_sync_correlation(np.arange(20.0), [0.5] * 20) == pytest.approx(1.0)
+
+    @pytest.mark.parametrize("duration", [0.0, 5.0, 60.0])
+    def test_sampling_plan_short_videos_unchanged(self, video_detector, duration):
+        """Videos within budget keep the original 10 FPS landmarks / 1 FPS faces."""
+        assert video_detector._sampling_plan(duration) == (10.0, 10)
+
+    @pytest.mark.parametrize("duration", [61.0, 600.0, 3600.0])
+    def test_sampling_plan_long_videos_capped(self, video_detector, duration):
+        """Long videos are thinned to the landmark and face sample budgets."""
+        video = video_module()
+        target_fps, face_every = video_detector._sampling_plan(duration)
+        samples = duration * target_fps
+        assert samples <= video.MAX_LANDMARK_SAMPLES + 1e-6
+        assert samples / face_every <= video.MAX_FACE_SAMPLES
+
+
+# --------------------------------------------------------------------
+# POSTPROCESSING
+# --------------------------------------------------------------------
+
+def test_postprocess_predictions_matches_softmax():
+    """logsumexp confidence on the argmax logit equals max(softmax) of the original."""
+    torch = pytest.importorskip("torch")
+    from utils.postprocess import postprocess_predictions
+
+    logits = torch.randn(16, 5, generator=torch.Generator().manual_seed(0)) * 10
+    confidences, indices = torch.max(torch.softmax(logits, dim=1), dim=1)
+
+    predictions = postprocess_predictions(logits)["predictions"]
+    assert [p["label"] for p in predictions] == [f"class_{i}" for i in indices.tolist()]
+    np.testing.assert_allclose([p["confidence"] for p in predictions], confidences.tolist(), rtol=1e-6)
+    assert [p["metadata"]["raw_scores"] for p in predictions] == logits.tolist()
+
+
+# --------------------------------------------------------------------
+# FILE TYPE SNIFFING
+# --------------------------------------------------------------------
+
+def test_is_image_matches_magic_number_loop():
+    """The compiled magic-number regex accepts exactly what the startswith loop did."""
+    main = main_module()
+
+    magic_numbers = [b"\xFF\xD8\xFF", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a", b"RIFF", b"BM"]
+    exts = [".png", ".jpg", ".jpeg", ".webp", ".tif", ".tiff", ".bmp", ".gif"]
+
+    def old_is_image(file_bytes, filename=None):
+        if any(file_bytes.startswith(magic) for magic in magic_numbers):
+            return True
+        return bool(filename) and any(filename.lower().endswith(ext) for ext in exts)
+
+    samples = magic_numbers + [
+        b"", b"B", b"GIF88a", b"%PDF-1.7", b"\x89PNG", b"xBM", b"RIFX", b"\xFF\xD8\xFE",
+    ]
+    filenames = [None, "", "scan.PNG", "photo.jpeg", "doc.pdf", "archive.tar.gz", "gif"]
+    for data in samples:
+        for name in filenames:
+            payload = data + b"\x00" * 16
+            assert main._is_image(payload, None, name) == old_is_image(payload, name), (data, name)
+    assert main._is_image(b"", "IMAGE/png")
+
+
+# --------------------------------------------------------------------
+# DOCUMENT VERIFICATION (main app)
+# --------------------------------------------------------------------
+
+def test_main_document_verification_uses_startup_verifier(monkeypatch):
+    """process_document_verification imported by main sees the verifier main's startup set up."""
+    main = main_module()
+    from apps.docs_svc import document
+
+    async def scenario():
+        await main._verifier_start()
+        try:
+            assert document.verifier is not None
+
+            async def verify_document(input_data, compact=False):
+                return {"confidence_score": 0.9, "legitimate": True}
+
+            # Keep the external verification API out of the test
+            monkeypatch.setattr(document.verifier, "verify_document", verify_document)
+            request = main.VerifyRequest(
+                PAGES=[main.PageData(pdf_bytes="JVBERi0xLjQ=")], DOC_META=main.DocMeta(title="Lease")
+            )
+            return await main.process_document_verification(request, compact=True)
+        finally:
+            await main._verifier_stop()
+
+    assert asyncio.run(scenario()) == {"confidence_score": 0.9, "legitimate": True}
+
+
+# --------------------------------------------------------------------
+# UPLOAD SPOOLING & SPAM PRE-FILTER (main app)
+# --------------------------------------------------------------------
+
+def test_spool_upload_copies_and_enforces_limit(tmp_path, monkeypatch):
+    """Uploads are streamed to tmpdir; an oversized one raises 400 and leaves no partial file."""
+    main = main_module()
+    monkeypatch.setattr(main, "UPLOAD_CHUNK", 4)
+    monkeypatch.setattr(main, "MAX_BYTES", 10)
+
+    path = main._spool_upload(io.BytesIO(b"0123456789"), ".wav", str(tmp_path))
+    assert os.path.dirname(path) == str(tmp_path) and path.endswith(".wav")
+    with open(path, "rb") as f:
+        assert f.read() == b"0123456789"
+    os.unlink(path)
+
+    with pytest.raises(main.HTTPException) as excinfo:
+        main._spool_upload(io.BytesIO(b"0123456789A"), ".wav", str(tmp_path))
+    assert excinfo.value.status_code == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_audio_spool_dir_needs_room_for_max_upload(tmp_path, monkeypatch):
+    """tmpfs is only used for audio when it can hold a maximum-size upload."""
+    main = main_module()
+    monkeypatch.setattr(main, "DF_TMPDIR", str(tmp_path))
+    monkeypatch.setattr(main, "MAX_BYTES", 1)
+    assert main._audio_spool_dir() == str(tmp_path)
+    monkeypatch.setattr(main, "MAX_BYTES", 1 << 62)
+    assert main._audio_spool_dir() is None
+    monkeypatch.setattr(main, "DF_TMPDIR", None)
+    assert main._audio_spool_dir() is None
+
+
+def test_spam_prefilter_matches_baseline_lr(tmp_path, monkeypatch):
+    """The sparse dot-product pre-filter reproduces the baseline LR's predict_proba."""
+    main = main_module()
+    pytest.importorskip("sklearn")
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = ["win a free prize now", "meeting moved to noon", "claim your free cash", "lunch tomorrow?"]
+    vectorizer = TfidfVectorizer().fit(texts)
+    lr = LogisticRegression().fit(vectorizer.transform(texts), [1, 0, 1, 0])
+    monkeypatch.setattr(main, "TFIDF_VECTORIZER_PATH", str(tmp_path / "tfidf.joblib"))
+    monkeypatch.setattr(main, "BASELINE_LR_PATH", str(tmp_path / "lr.joblib"))
+    joblib.dump(vectorizer, main.TFIDF_VECTORIZER_PATH)
+    joblib.dump(lr, main.BASELINE_LR_PATH)
+
+    monkeypatch.setattr(main, "_spam_prefilter", main._load_spam_prefilter())
+    for text in texts + ["free noon prize"]:
+        expected = lr.predict_proba(vectorizer.transform([text]))[0, 1]
+        assert main._prefilter_spam_probability(text) == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.parametrize("probability, answered_by_baseline", [
+    (0.01, True), (0.05, False), (0.5, False), (0.95, False), (0.99, True),
+])
+def test_spam_prefilter_thresholds(monkeypatch, probability, answered_by_baseline):
+    """Only probabilities strictly outside [LOW, HIGH] skip the transformer."""
+    main = main_module()
+    submitted = []
+
+    async def submit(text):
+        submitted.append(text)
+        return 1, 0.7
+
+    monkeypatch.setattr(main, "spam_model", object())
+    monkeypatch.setattr(main, "tokenizer", object())
+    monkeypatch.setattr(main, "_spam_prefilter", object())
+    monkeypatch.setattr(main, "SPAM_PREFILTER_LOW", 0.05)
+    monkeypatch.setattr(main, "SPAM_PREFILTER_HIGH", 0.95)
+    monkeypatch.setattr(main, "_prefilter_spam_probability", lambda text: probability)
+    monkeypatch.setattr(main.spam_batcher, "submit", submit)
+
+    response = asyncio.run(main.detect_spam(main.SpamRequest(text="hello")))
+    if answered_by_baseline:
+        assert submitted == []
+        assert response["is_spam"] == (probability > 0.95)
+        assert response["probability"] == probability
+    else:
+        assert submitted == ["hello"]
+        assert response["probability"] == 0.7
+
+
+# --------------------------------------------------------------------
+# MICRO-BATCHING
+# --------------------------------------------------------------------
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    """Concurrent submits share run_batch calls of at most max_batch_size, in order."""
+    from utils.batching import MicroBatcher
+
+    sizes = []
+
+    def run_batch(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=4, timeout_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == [i * 2 for i in range(10)]
+    assert sizes == [4, 4, 2]
+
+
+@pytest.mark.parametrize("run_batch, message", [
+    (lambda items: 1 / 0, "division by zero"),
+    (lambda items: items[:-1], "results for"),
+])
+def test_micro_batcher_fails_whole_batch(run_batch, message):
+    """A raising or short run_batch fails every caller in the batch, and the batcher keeps serving."""
+    from utils.batching import MicroBatcher
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=3, timeout_ms=50)
+        batcher.start()
+        try:
+            failed = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+            batcher.run_batch = lambda items: items
+            return failed, await batcher.submit(7)
+        finally:
+            await batcher.stop()
+
+    failed, after = asyncio.run(scenario())
+    assert all(isinstance(e, Exception) and message in str(e) for e in failed)
+    assert after == 7
+
+
+def test_micro_batcher_stop_fails_pending_calls():
+    """stop() resolves in-flight and queued calls with an error instead of leaving them hanging."""
+    from utils.batching import MicroBatcher
+
+    release = threading.Event()
+
+    def run_batch(items):
+        release.wait(5)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(run_batch, max_batch_size=1, timeout_ms=1)
+        batcher.start()
+        calls = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)  # first call in flight, the others queued
+        await batcher.stop()
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+        with pytest.raises(RuntimeError):
+            await batcher.submit(3)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) and "stopped" in str(r) for r in results)
+
+
+# --------------------------------------------------------------------
+# DOCUMENT TEXT CACHE
+# --------------------------------------------------------------------
+
+class TestDocumentTextCache:
+    """DocumentVerifier._cached_extract: TTL expiry, LRU eviction, failed extractions not cached."""
+
+    @pytest.fixture
+    def verifier(self):
+        pytest.importorskip("aiohttp")
+        from docs.document_verifier import DocumentVerifier
+        return DocumentVerifier(external_api_url="http://localhost")
+
+    @staticmethod
+    def extractor(calls, result=None):
+        async def extract(content):
+            calls.append(content)
+            return f"text:{content}" if result is None else result
+        return extract
+
+    def test_ttl(self, verifier, monkeypatch):
+        from docs import document_verifier
+        now = [1000.0]
+        monkeypatch.setattr(document_verifier.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(document_verifier, "TEXT_CACHE_TTL", 60.0)
+        calls = []
+        extract = self.extractor(calls)
+
+        assert asyncio.run(verifier._cached_extract("pdf", "a", extract)) == "text:a"
+        now[0] += 59
+        assert asyncio.run(verifier._cached_extract("pdf", "a", extract)) == "text:a"
+        assert asyncio.run(verifier._cached_extract("image", "a", extract)) == "text:a"
+        now[0] += 2
+        assert asyncio.run(verifier._cached_extract("pdf", "a", extract)) == "text:a"
+        assert calls == ["a", "a", "a"]
+
+    def test_lru_eviction(self, verifier, monkeypatch):
+        from docs import document_verifier
+        monkeypatch.setattr(document_verifier, "TEXT_CACHE_SIZE", 2)
+        calls = []
+        extract = self.extractor(calls)
+
+        for content in ["a", "b", "a", "c", "a", "b"]:
+            asyncio.run(verifier._cached_extract("pdf", content, extract))
+        # "b" was least recently used when "c" arrived, so only it is extracted again
+        assert calls == ["a", "b", "c", "b"]
+        assert len(verifier._text_cache) == 2
+
+    def test_failed_extraction_not_cached(self, verifier):
+        calls = []
+        extract = self.extractor(calls, result="")
+        asyncio.run(verifier._cached_extract("pdf", "a", extract))
+        asyncio.run(verifier._cached_extract("pdf", "a", extract))
+        assert calls == ["a", "a"]
+        assert len(verifier._text_cache) == 0
+
+
+# --------------------------------------------------------------------
+# ADAPTATION REPLAY BUFFER
+# --------------------------------------------------------------------
+
+def test_replay_buffer_keeps_latest_samples():
+    """The list ring holds the same most-recent samples a bounded deque did."""
+    pytest.importorskip("torch")
+    pytest.importorskip("sklearn")
+    from collections import deque
+    from core.adaptation import ReplayBuffer
+
+    buffer, reference = ReplayBuffer(max_size=7), deque(maxlen=7)
+    for i in range(23):
+        buffer.add({"input": i, "label": i % 2})
+        reference.append({"input": i, "label": i % 2})
+        assert len(buffer) == len(reference)
+
+    assert sorted(s["input"] for s in buffer.buffer) == sorted(s["input"] for s in reference)
+    batch = buffer.sample(5)
+    assert len(batch) == 5
+    assert len({s["input"] for s in batch}) == 5
+    assert len(buffer.sample(100)) == 7
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -9,10 +9,43 @@ from sklearn.metrics import roc_auc_score, accuracy_score
 import numpy as np
 
 from models.text.deepfake import DeepFakeDetector
-from data_preprocessing import get_data_loaders, augment_audio, augment_video
+from data_preprocessing import get_data_loaders, augment_audio, augment_video, AudioBatchTransform, VideoBatchTransform
 from core.adaptation import AdaptationEngine
 
-def train_audio_model(model, train_loader, val_loader, epochs=10, save_path='models/audio_model.pth'):
+# torch.compile mode for the on-device batch transforms (empty keeps eager). Not
+# reduce-overhead: CUDA-graph outputs are reused buffers and augment_audio writes in place.
+TRANSFORM_COMPILE_MODE = os.getenv("TRANSFORM_COMPILE_MODE", "default")
+
+def compile_transform(transform):
+    """torch.compile a batch transform so its elementwise stages fuse; falls back to eager."""
+    if transform is None or not TRANSFORM_COMPILE_MODE or not hasattr(torch, "compile"):
+        return transform
+    try:
+        return torch.compile(transform, mode=TRANSFORM_COMPILE_MODE)
+    except Exception as e:
+        print(f"torch.compile failed for {type(transform).__name__}, using eager: {e}")
+        return transform
+
+def audio_inputs(batch, device, audio_transform=None):
+    """
+    Model-ready fp32 mel features on `device`; raw waveform batches are featurized
+    there in one pass, and float16 mel batches are transferred before upcasting
+    """
+    if 'waveform' in batch:
+        with torch.no_grad():
+            return audio_transform(batch['waveform'].to(device, non_blocking=True))
+    return batch['input_values'].to(device, non_blocking=True).float()
+
+def video_inputs(batch, device, video_transform=None):
+    """Normalized clips on `device`; raw uint8 clip batches are scaled there in one pass"""
+    pixel_values = batch['pixel_values'].to(device, non_blocking=True)
+    if video_transform is not None:
+        with torch.no_grad():
+            pixel_values = video_transform(pixel_values)
+    return pixel_values
+
+def train_audio_model(model, train_loader, val_loader, epochs=10, save_path='models/audio_model.pth',
+                      device='cpu', audio_transform=None):
     """Train audio-only model"""
     criterion = nn.BCEWithLogitsLoss()
     optimizer = torch.optim.AdamW(model.parameters(), lr=3e-5)
@@ -27,10 +60,10 @@ def train_audio_model(model, train_loader, val_loader, epochs=10, save_path='mod
             optimizer.zero_grad()
 
             # Apply augmentations
-            augmented_input = augment_audio(batch['input_values'])
+            augmented_input = augment_audio(audio_inputs(batch, device, audio_transform))
 
             outputs = model.audio_branch(augmented_input)
-            loss = criterion(outputs.squeeze(), batch['labels'])
+            loss = criterion(outputs.squeeze(), batch['labels'].to(device, non_blocking=True))
             loss.backward()
             optimizer.step()
 
@@ -43,7 +76,7 @@ def train_audio_model(model, train_loader, val_loader, epochs=10, save_path='mod
 
         with torch.no_grad():
             for batch in val_loader:
-                outputs = model.audio_branch(batch['input_values'])
+                outputs = model.audio_branch(audio_inputs(batch, device, audio_transform))
                 preds = torch.sigmoid(outputs.squeeze()).cpu().numpy()
                 val_preds.extend(preds)
                 val_labels.extend(batch['labels'].cpu().numpy())
@@ -60,7 +93,8 @@ def train_audio_model(model, train_loader, val_loader, epochs=10, save_path='mod
 
     return model
 
-def train_video_model(model, train_loader, val_loader, epochs=10, save_path='models/video_model.pth'):
+def train_video_model(model, train_loader, val_loader, epochs=10, save_path='models/video_model.pth',
+                      device='cpu', video_transform=None):
     """Train video-only model"""
     criterion = nn.BCEWithLogitsLoss()
     optimizer = torch.optim.AdamW(model.parameters(), lr=3e-5)
@@ -75,10 +109,10 @@ def train_video_model(model, train_loader, val_loader, epochs=10, save_path='mod
             optimizer.zero_grad()
 
             # Apply augmentations
-            augmented_input = augment_video(batch['pixel_values'])
+            augmented_input = augment_video(video_inputs(batch, device, video_transform))
 
             outputs = model.video_branch(augmented_input)
-            loss = criterion(outputs.squeeze(), batch['labels'])
+            loss = criterion(outputs.squeeze(), batch['labels'].to(device, non_blocking=True))
             loss.backward()
             optimizer.step()
 
@@ -91,7 +125,7 @@ def train_video_model(model, train_loader, val_loader, epochs=10, save_path='mod
 
         with torch.no_grad():
             for batch in val_loader:
-                outputs = model.video_branch(batch['pixel_values'])
+                outputs = model.video_branch(video_inputs(batch, device, video_transform))
                 preds = torch.sigmoid(outputs.squeeze()).cpu().numpy()
                 val_preds.extend(preds)
                 val_labels.extend(batch['labels'].cpu().numpy())
@@ -108,7 +142,8 @@ def train_video_model(model, train_loader, val_loader, epochs=10, save_path='mod
 
     return model
 
-def train_fusion_model(model, audio_train_loader, audio_val_loader, video_train_loader, video_val_loader, epochs=10, save_path='models/fusion_model.pth'):
+def train_fusion_model(model, audio_train_loader, audio_val_loader, video_train_loader, video_val_loader, epochs=10, save_path='models/fusion_model.pth',
+                       device='cpu', audio_transform=None, video_transform=None):
     """Train fusion model"""
     criterion = nn.BCEWithLogitsLoss()
     optimizer = torch.optim.AdamW(model.parameters(), lr=3e-5)
@@ -132,9 +167,9 @@ def train_fusion_model(model, audio_train_loader, audio_val_loader, video_train_
 
             optimizer.zero_grad()
 
-            audio_input = audio_batch['input_values'] if audio_batch else None
-            video_input = video_batch['pixel_values'] if video_batch else None
-            labels = audio_batch['labels'] if audio_batch else video_batch['labels']
+            audio_input = audio_inputs(audio_batch, device, audio_transform) if audio_batch else None
+            video_input = video_inputs(video_batch, device, video_transform) if video_batch else None
+            labels = (audio_batch['labels'] if audio_batch else video_batch['labels']).to(device, non_blocking=True)
 
             # Apply augmentations
             if audio_input is not None:
@@ -164,9 +199,9 @@ def train_fusion_model(model, audio_train_loader, audio_val_loader, video_train_
             if audio_batch is None and video_batch is None:
                 break
 
-            audio_input = audio_batch['input_values'] if audio_batch else None
-            video_input = video_batch['pixel_values'] if video_batch else None
-            labels = audio_batch['labels'] if audio_batch else video_batch['labels']
+            audio_input = audio_inputs(audio_batch, device, audio_transform) if audio_batch else None
+            video_input = video_inputs(video_batch, device, video_transform) if video_batch else None
+            labels = (audio_batch['labels'] if audio_batch else video_batch['labels']).to(device, non_blocking=True)
 
             with torch.no_grad():
                 outputs = model(audio_input=audio_input, video_input=video_input)
@@ -190,23 +225,32 @@ def main():
     # Create models directory
     os.makedirs('models', exist_ok=True)
 
-    # Load data
-    data_loaders = get_data_loaders('data', batch_size=16)
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+    # Load data; on GPU, batches are prefetched to the device and audio features and
+    # video normalization are computed there per batch
+    use_gpu_transforms = device == 'cuda'
+    data_loaders = get_data_loaders('data', batch_size=16, raw_audio=use_gpu_transforms,
+                                    raw_video=use_gpu_transforms, device=device)
+    audio_transform = compile_transform(AudioBatchTransform().to(device)) if use_gpu_transforms else None
+    video_transform = VideoBatchTransform().to(device) if use_gpu_transforms else None
 
     # Initialize model
-    model = DeepFakeDetector(use_lora=True)
+    model = DeepFakeDetector(use_lora=True).to(device)
 
     # Train audio model
     if data_loaders['audio_train'] and data_loaders['audio_val']:
         print("Training audio model...")
         model = train_audio_model(model, data_loaders['audio_train'], data_loaders['audio_val'],
-                                epochs=10, save_path='models/audio_model.pth')
+                                epochs=10, save_path='models/audio_model.pth',
+                                device=device, audio_transform=audio_transform)
 
     # Train video model
     if data_loaders['video_train'] and data_loaders['video_val']:
         print("Training video model...")
         model = train_video_model(model, data_loaders['video_train'], data_loaders['video_val'],
-                                epochs=10, save_path='models/video_model.pth')
+                                epochs=10, save_path='models/video_model.pth',
+                                device=device, video_transform=video_transform)
 
     # Train fusion model
     if (data_loaders['audio_train'] and data_loaders['video_train'] and
@@ -214,7 +258,9 @@ def main():
         print("Training fusion model...")
         model = train_fusion_model(model, data_loaders['audio_train'], data_loaders['audio_val'],
                                  data_loaders['video_train'], data_loaders['video_val'],
-                                 epochs=10, save_path='models/fusion_model.pth')
+                                 epochs=10, save_path='models/fusion_model.pth',
+                                 device=device, audio_transform=audio_transform,
+                                 video_transform=video_transform)
 
     print("Training completed!")
 
@@ -1,6 +1,7 @@
 # utils/aws_utils.py
 import os
 import logging
+import functools
 from typing import Optional, Tuple
 import urllib.parse
 
@@ -19,7 +20,9 @@ class DownloadError(Exception):
         super().__init__(message)
         self.status = status
 
+@functools.lru_cache(maxsize=1)
 def _build_s3_client():
+    # boto3 clients are thread-safe and slow to build; share one per process
     cfg = Config(region_name=AWS_REGION, retries={"max_attempts": 5, "mode": "standard"}, signature_version="s3v4")
     akid = os.getenv("AWS_ACCESS_KEY_ID")
     asec = os.getenv("AWS_SECRET_ACCESS_KEY")
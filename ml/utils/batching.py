@@ -0,0 +1,98 @@
+"""
+Generic asyncio micro-batching used by the model-serving endpoints.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into one batched call.
+
+    Callers `await submit(item)`; a background task drains up to
+    `max_batch_size` queued items (waiting at most `timeout_ms` after the first
+    one), runs the blocking `run_batch(items)` once in a worker thread and hands
+    each caller its entry of the returned per-item results. Batches run one at a
+    time, so `run_batch` may reuse buffers between calls. `run_batch` must return
+    exactly one result per item, otherwise the whole batch fails; `stop()` fails
+    every call still queued or in flight.
+    """
+
+    def __init__(self, run_batch, max_batch_size=32, timeout_ms=5.0, name="batch"):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout_ms / 1000.0
+        self.name = name
+        self._queue = None
+        self._worker = None
+        self._batch = []  # items taken off the queue and not yet answered
+
+    def start(self):
+        """Start the background batching task on the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the background task and fail every queued or in-flight call."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            pending = self._batch
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._batch = []
+            error = RuntimeError(f"{type(self).__name__} ({self.name}) stopped")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def submit(self, item):
+        """Queue one item and wait for its result."""
+        if self._worker is None:
+            raise RuntimeError(f"{type(self).__name__} ({self.name}) is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        # Collected into self._batch so stop() can fail items cancelled mid-batch
+        batch = self._batch = [await self._queue.get()]
+        deadline = loop.time() + self.timeout
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                # Run the batch in a worker thread so the event loop keeps serving
+                results = await asyncio.to_thread(self.run_batch, [item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.error("Batched %s failed for %s items: %s", self.name, len(batch), e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self._batch = []
@@ -21,6 +21,33 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+RESIZE_SIZE = 256
+CROP_SIZE = 224
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
+# ToTensor + Normalize folded into one multiply-subtract: (x/255 - mean)/std == x*scale - bias
+if IMAGE_PROCESSING_AVAILABLE:
+    _STD = torch.tensor(IMAGENET_STD, dtype=torch.float32).view(3, 1, 1)
+    _SCALE = 1.0 / (255.0 * _STD)
+    _BIAS = torch.tensor(IMAGENET_MEAN, dtype=torch.float32).view(3, 1, 1) / _STD
+
+def _resize_and_center_crop(image, resize_size: int = RESIZE_SIZE, crop_size: int = CROP_SIZE):
+    """
+    Resize the shorter side to `resize_size` and center-crop to `crop_size`,
+    operating on the uint8 PIL image so no full-resolution float tensor is built.
+    """
+    w, h = image.size
+    if w <= h:
+        new_w, new_h = resize_size, int(resize_size * h / w)
+    else:
+        new_w, new_h = int(resize_size * w / h), resize_size
+    image = image.resize((new_w, new_h), Image.BILINEAR)
+
+    left = int(round((new_w - crop_size) / 2.0))
+    top = int(round((new_h - crop_size) / 2.0))
+    return image.crop((left, top, left + crop_size, top + crop_size))
+
 def get_image_transforms():
     """
     Get standard image transforms for ResNet50 preprocessing.
@@ -33,7 +60,7 @@ def get_image_transforms():
         transforms.Resize(256),
         transforms.CenterCrop(224),
         transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
     ])
 
 def preprocess_image_for_model(image_bytes: bytes) -> Optional[torch.Tensor]:
@@ -44,28 +71,32 @@ def preprocess_image_for_model(image_bytes: bytes) -> Optional[torch.Tensor]:
         image_bytes: Raw image bytes
 
     Returns:
-        Preprocessed tensor ready for model inference, or None if processing fails
+        Preprocessed (3, H, W) tensor ready for batching, or None if processing fails
     """
     if not IMAGE_PROCESSING_AVAILABLE:
         logger.error("Image processing libraries not available for model preprocessing")
         return None
 
     try:
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-
-        # Get transforms
-        transform = get_image_transforms()
-        if transform is None:
-            return None
+        # Convert bytes to PIL Image; for JPEGs let the decoder downscale
+        # in the DCT domain as long as the result still covers RESIZE_SIZE
+        image = Image.open(io.BytesIO(image_bytes))
+        image.draft('RGB', (RESIZE_SIZE, RESIZE_SIZE))
+        image = image.convert('RGB')
 
-        # Apply transforms
-        tensor = transform(image)
+        # Resize and crop on uint8 pixels before converting to a float tensor
+        image = _resize_and_center_crop(image)
 
-        # Add batch dimension
-        tensor = tensor.unsqueeze(0)
+        # View the PIL pixel bytes as an HWC uint8 tensor (no NumPy intermediate; a
+        # writable bytearray, since frombuffer warns on immutable bytes),
+        # convert into a contiguous CHW float32 buffer, then normalize in place
+        w, h = image.size
+        pixels = torch.frombuffer(bytearray(image.tobytes()), dtype=torch.uint8).view(h, w, 3)
+        tensor = torch.empty((3, h, w), dtype=torch.float32)
+        tensor.copy_(pixels.permute(2, 0, 1))
+        tensor.mul_(_SCALE).sub_(_BIAS)
 
-        logger.info(f"Image preprocessed for model: shape {tensor.shape}")
+        logger.debug("Image preprocessed for model: shape %s", tuple(tensor.shape))
         return tensor
 
     except Exception as e:
@@ -8,23 +8,30 @@ def postprocess_predictions(raw_predictions: torch.Tensor):
     Adds confidence, labels, metadata.
     """
     # For placeholder, assume raw_predictions is a tensor of shape (batch_size, num_classes)
-    # We take softmax to get confidence scores
-    probabilities = torch.nn.functional.softmax(raw_predictions, dim=1)
-    confidences, predicted_indices = torch.max(probabilities, dim=1)
+    # Softmax is monotonic, so argmax on the logits picks the same class; the
+    # confidence is the softmax of the picked logit only, exp(x_i - logsumexp(x))
+    predicted_indices = raw_predictions.argmax(dim=1)
+    picked_logits = raw_predictions.gather(1, predicted_indices.unsqueeze(1)).squeeze(1)
+    confidences = torch.exp(picked_logits - torch.logsumexp(raw_predictions, dim=1))
 
     # Dummy labels for example
     labels = [f"class_{i}" for i in range(raw_predictions.size(1))]
 
-    results = []
-    for i in range(raw_predictions.size(0)):
-        result = {
-            "label": labels[predicted_indices[i].item()],
-            "confidence": confidences[i].item(),
+    # Single device->host transfer per tensor instead of per-element .item() calls
+    conf_list = confidences.tolist()
+    idx_list = predicted_indices.tolist()
+    raw_list = raw_predictions.tolist()
+
+    results = [
+        {
+            "label": labels[idx],
+            "confidence": conf,
             "metadata": {
-                "raw_scores": raw_predictions[i].tolist()
+                "raw_scores": raw
             }
         }
-        results.append(result)
+        for idx, conf, raw in zip(idx_list, conf_list, raw_list)
+    ]
 
     return {"predictions": results}
 
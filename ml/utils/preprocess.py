@@ -78,7 +78,7 @@ def extract_text_with_tesseract(image: Image.Image) -> str:
         # Extract text
         text = pytesseract.image_to_string(image, config=custom_config, lang='eng')
 
-        logger.info(f"Tesseract OCR completed: extracted {len(text)} characters")
+        logger.info("Tesseract OCR completed: extracted %d characters", len(text))
         return text.strip()
 
     except Exception as e:
@@ -139,7 +139,7 @@ def extract_text_from_pdf_local(pdf_bytes: bytes) -> Dict[str, Any]:
         total_confidence = 0.0
 
         for i, image in enumerate(images):
-            logger.info(f"Processing PDF page {i+1}/{len(images)}")
+            logger.info("Processing PDF page %d/%d", i + 1, len(images))
 
             # Preprocess image for OCR
             img_byte_arr = io.BytesIO()